@@ -1,5 +1,4 @@
 import random
-from collections import deque
 
 import numpy as np
 import torch
@@ -8,8 +7,8 @@ from numpy import ndarray
 import config
 import ppo
 from Game import Game
-from Player import Player
 from model import QTrainer
+from replay_buffer import ReplayBuffer
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
@@ -19,6 +18,99 @@ MAX_PLAYERS = 8
 STATES_PER_PLAYER = 8
 MAX_BULLETS = 8
 STATES_PER_BULLET = 2
+STATE_SIZE = MAX_PLAYERS * STATES_PER_PLAYER + MAX_BULLETS * STATES_PER_BULLET
+ACTION_SIZE = 8
+
+
+def _nearest(distance: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Column indices of the ``k`` smallest entries of every row of
+    ``distance``, nearest first, and whether each one is finite.
+    """
+    n = distance.shape[1]
+    if n > k:
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+    else:
+        nearest = np.broadcast_to(np.arange(n), distance.shape)
+    nearest_distance = np.take_along_axis(distance, nearest, axis=1)
+    order = np.argsort(nearest_distance, axis=1, kind="stable")
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    valid = np.isfinite(np.take_along_axis(nearest_distance, order, axis=1))
+    return nearest, valid
+
+
+class GameSnapshot:
+    """
+    The state of every player and bullet of a game at one tick, as arrays
+    shared by all of its AIs.
+
+    :meth:`encode` builds fixed-size states for any number of AIs with a few
+    array operations. A state holds ``MAX_PLAYERS`` player slots of
+    ``STATES_PER_PLAYER`` values and ``MAX_BULLETS`` bullet slots of
+    ``STATES_PER_BULLET`` values:
+
+    - slot 0 is the AI's own player, at its absolute position;
+    - the other slots hold the nearest other players, then the nearest
+      bullets, nearest first, with positions relative to the AI;
+    - a player slot is ``(y, x, rotation, hp, max_hp, score, enemy,
+      cooldown)`` and a bullet slot ``(y, x)``.
+
+    Unused slots are zeros and are cleared in the returned validity mask, so
+    states of games with any number of players batch together.
+    """
+
+    def __init__(self, game):
+        players = game.players
+        self.table = np.array(
+            [
+                (p.y, p.x, p.rotation, p.hp, p.max_hp, p.score, 0, p.cooldown)
+                for p in players
+            ],
+            dtype=np.float64,
+        ).reshape(-1, STATES_PER_PLAYER)
+        self.teams = np.array([p.team for p in players])
+        self.rows = {id(p.ai): i for i, p in enumerate(players)}
+        self.bullets = np.array(
+            [(b.y, b.x) for b in game.bullets], dtype=np.float64
+        ).reshape(-1, STATES_PER_BULLET)
+
+    def encode(self, ais: list["AI"]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the ``(len(ais), STATE_SIZE)`` states of ``ais`` and their
+        ``(len(ais), MAX_PLAYERS + MAX_BULLETS)`` validity masks.
+        """
+        rows = np.array([self.rows[id(ai)] for ai in ais], dtype=np.intp)
+        count = len(rows)
+        origin = self.table[rows, :2]
+
+        players = np.zeros((count, MAX_PLAYERS, STATES_PER_PLAYER))
+        player_mask = np.zeros((count, MAX_PLAYERS), dtype=bool)
+        players[:, 0] = self.table[rows]
+        player_mask[:, 0] = True
+
+        offset = self.table[None, :, :2] - origin[:, None]
+        distance = (offset**2).sum(axis=2)
+        distance[np.arange(count), rows] = np.inf
+        others, valid = _nearest(distance, MAX_PLAYERS - 1)
+        slots = players[:, 1 : 1 + others.shape[1]]
+        slots[...] = self.table[others]
+        slots[..., :2] = np.take_along_axis(offset, others[..., None], axis=1)
+        slots[..., 6] = self.teams[others] != self.teams[rows, None]
+        slots[~valid] = 0
+        player_mask[:, 1 : 1 + others.shape[1]] = valid
+
+        bullets = np.zeros((count, MAX_BULLETS, STATES_PER_BULLET))
+        bullet_mask = np.zeros((count, MAX_BULLETS), dtype=bool)
+        offset = self.bullets[None] - origin[:, None]
+        nearest, valid = _nearest((offset**2).sum(axis=2), MAX_BULLETS)
+        slots = bullets[:, : nearest.shape[1]]
+        slots[...] = np.take_along_axis(offset, nearest[..., None], axis=1)
+        bullet_mask[:, : nearest.shape[1]] = valid
+
+        states = np.concatenate(
+            (players.reshape(count, -1), bullets.reshape(count, -1)), axis=1
+        )
+        return states, np.concatenate((player_mask, bullet_mask), axis=1)
 
 
 class AI:
@@ -31,11 +123,11 @@ class AI:
         self.number_of_games = 0
         self.epsilon = 0  # aleatorização
         self.gamma = 0.9  # discount rate
-        self.memory = deque(maxlen=MAX_MEMORY)
+        self.memory = ReplayBuffer(MAX_MEMORY, STATE_SIZE, ACTION_SIZE)
         self.device = torch.device("cpu")
         if torch.cuda.is_available():
             self.device = torch.device("cuda")
-        self.model = ppo.ActorPPO(64, 8, self.device)
+        self.model = ppo.ActorPPO(STATE_SIZE, ACTION_SIZE, self.device)
         self.trainer = QTrainer(self.model, lr=LEARNING_RATE, gamma=self.gamma)
         self.is_train = is_train
         self.old_state = None
@@ -44,68 +136,20 @@ class AI:
     def set_player(self, player):
         self.player = player
 
-    def get_enemies(self, game):
-        ai_player: Player = self.get_player(game)
-        enemies: list[Player] = []
-        for player in game.players:
-            if player.team != ai_player.team:
-                enemies.append(player)
-        return enemies
-
-    def get_allies(self, game):
-        ai_player = self.get_player(game)
-        allies = []
-        for player in game.players:
-            if player.team == ai_player.team:
-                allies.append(player)
-        return allies
-
-    def get_state(self, game) -> np.ndarray:
-        ai_player = self.get_player(game)
-        enemies = self.get_enemies(game)
-        allies = self.get_allies(game)
-        bullets = game.bullets
-
-        state = np.zeros(MAX_PLAYERS * STATES_PER_PLAYER)
-
-        state[0] = ai_player.y
-        state[1] = ai_player.x
-        state[2] = ai_player.rotation
-        state[3] = ai_player.hp
-        state[4] = ai_player.max_hp
-        state[5] = ai_player.score
-        state[6] = ai_player.uuid
-        state[7] = ai_player.cooldown
-        i = 8
-        i = self.save_state_from(enemies, i, state)
-        self.save_state_from(allies, i, state)
-
-        return state
-
-    @staticmethod
-    def save_state_from(enemies, i, state):
-        for enemy in enemies:
-            state[i] = enemy.y
-            state[i + 1] = enemy.x
-            state[i + 2] = enemy.rotation
-            state[i + 3] = enemy.hp
-            state[i + 4] = enemy.max_hp
-            state[i + 5] = enemy.score
-            state[i + 6] = enemy.uuid
-            state[i + 7] = enemy.cooldown
-            i += 8
-        return i
+    def get_state(self, game, snapshot: "GameSnapshot | None" = None) -> np.ndarray:
+        """
+        State of this AI's player. Pass the tick's ``snapshot`` when several
+        AIs share a game, so that the players are only read once per tick.
+        """
+        if snapshot is None:
+            snapshot = GameSnapshot(game)
+        return snapshot.encode([self])[0][0]
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.append(state, action, reward, next_state, done)
 
     def train_long_memory(self):
-        if len(self.memory) > BATCH_SIZE:
-            minibatch = random.sample(self.memory, BATCH_SIZE)
-        else:
-            minibatch = self.memory
-
-        states, actions, rewards, next_states, dones = zip(*minibatch)
+        states, actions, rewards, next_states, dones = self.memory.sample(BATCH_SIZE)
         self.trainer.train_step(states, actions, rewards, next_states, dones)
 
     def train_short_memory(self, state):
@@ -113,18 +157,29 @@ class AI:
             self.old_state, self.old_action, self.old_reward, state, False
         )
 
+    @staticmethod
+    def to_moves(predictions: np.ndarray) -> ndarray:
+        """
+        Turns network outputs into moves in place, one row per player: the
+        five keys are thresholded at 0.5 and the mouse is scaled to the screen.
+        """
+        predictions[..., :5] = predictions[..., :5] > 0.5
+        predictions[..., 5] *= config.WIDTH
+        predictions[..., 6] *= config.HEIGHT
+        return predictions
+
+    def get_actions(self, states: np.ndarray) -> ndarray:
+        """Moves for a ``(B, state_dim)`` batch of states, in one forward pass."""
+        self.epsilon = 0.3 if self.is_train else 0.1
+        return self.to_moves(self.model.act_batch(states, self.epsilon))
+
     def get_action(self, state: np.ndarray) -> ndarray:
         self.epsilon = 0.3 if self.is_train else 0.1
         prediction: np.ndarray = self.model.act(state, self.epsilon)
-        final_move = prediction
-        final_move[0] = 1 if final_move[0] > 0.5 else 0
-        final_move[1] = 1 if final_move[1] > 0.5 else 0
-        final_move[2] = 1 if final_move[2] > 0.5 else 0
-        final_move[3] = 1 if final_move[3] > 0.5 else 0
-        final_move[4] = 1 if final_move[4] > 0.5 else 0
-        final_move[5] = final_move[5] * config.WIDTH
-        final_move[6] = final_move[6] * config.HEIGHT
-        self.old_action = prediction
+        # QTrainer takes the argmax of the raw outputs as the action, so keep
+        # them before to_moves thresholds and scales them in place.
+        self.old_action = prediction.copy()
+        final_move = self.to_moves(prediction)
         self.old_state = state
         self.old_reward = self.player.score
 
@@ -194,7 +249,7 @@ def train():
 
         agent.train_short_memory(state_old, final_move, reward, state_new, done)
 
-        agent.remember(state_old, final_move, reward, state_new, done)
+        agent.remember(state_old, agent.old_action, reward, state_new, done)
 
         if done:
             # TODO: Implementar game.reset()
@@ -0,0 +1,362 @@
+"""
+Throughput benchmarks for TopDownShooterEnv.
+
+Run as a script to print a JSON report (or write it with ``--output``)::
+
+    python benchmark.py --output bench.json
+
+or under pytest-benchmark::
+
+    pytest benchmark.py
+
+The ``SharedMemoryVecEnv`` scaling cases start up to ``os.cpu_count()``
+workers each and are only run with ``--workers``, or under pytest with
+``TOPDOWN_SHOOTER_BENCHMARK_WORKERS=1``.
+
+Every case is seeded with ``SEED`` so that reports are comparable between
+releases.
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from topdown_shooter.envs import TopDownShooterEnv, kernels
+
+SEED = 0
+BULLET_COUNTS = (10, 100, 1000, 10000)
+WORKER_COUNTS = (4, 8, 16, 32)
+WORKERS_ENV_VAR = "TOPDOWN_SHOOTER_BENCHMARK_WORKERS"
+
+
+def worker_counts() -> list[int]:
+    """``WORKER_COUNTS`` capped at the number of cores of this machine."""
+    cores = os.cpu_count() or 1
+    return sorted({min(n, cores) for n in WORKER_COUNTS})
+
+
+def workers_requested() -> bool:
+    return os.environ.get(WORKERS_ENV_VAR, "").lower() not in ("", "0", "false")
+
+
+def ai_sizes() -> tuple[int, int]:
+    """
+    ``STATE_SIZE`` and ``ACTION_SIZE`` of ``AI.py``, evaluated from its
+    module-level constants since importing it needs the game.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AI.py")
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            name = node.targets[0]
+            if isinstance(name, ast.Name) and name.id.isupper():
+                expression = compile(ast.Expression(node.value), path, "eval")
+                constants[name.id] = eval(expression, {"__builtins__": {}}, constants)
+    return constants["STATE_SIZE"], constants["ACTION_SIZE"]
+
+
+def _make_env(**kwargs) -> TopDownShooterEnv:
+    env = TopDownShooterEnv(**kwargs)
+    env.reset(seed=SEED)
+    return env
+
+
+def step_case(backend: str = "numpy") -> Callable[[], None]:
+    env = _make_env(backend=backend)
+    actions = itertools.cycle(np.random.default_rng(SEED).integers(0, 2, (4096, 7)))
+
+    def step():
+        _, _, terminated, truncated, _ = env.step(next(actions))
+        if terminated or truncated:
+            env.reset()
+
+    return step
+
+
+def step_allocations(number: int = 1000, backend: str = "numpy") -> dict:
+    """
+    Memory traced by ``tracemalloc`` per ``step()``: the peak allocated on top
+    of what was live before the step, and what the step left allocated.
+    """
+    step = step_case(backend)
+    step()
+    tracemalloc.start()
+    try:
+        peak = 0
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in range(number):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step()
+            peak += tracemalloc.get_traced_memory()[1] - before
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_step": peak / number,
+        "retained_bytes_per_step": (end - start) / number,
+    }
+
+
+def reset_case() -> Callable[[], None]:
+    env = _make_env()
+    return lambda: env.reset(seed=SEED)
+
+
+def get_obs_case() -> Callable[[], None]:
+    env = _make_env()
+    for action in np.random.default_rng(SEED).integers(0, 2, (500, 7)):
+        env.step(action)
+    return env._get_obs
+
+
+def update_bullets_case(num_bullets: int) -> Callable[[], None]:
+    """Bullets are frozen in place so the live count stays stable across calls."""
+    env = _make_env(bullet_speed=0, max_bullets=num_bullets)
+    rng = np.random.default_rng(SEED)
+    for _ in range(num_bullets):
+        env._bullets.spawn(
+            rng.uniform(0, env.window_size[0]),
+            rng.uniform(0, env.window_size[1]),
+            rng.uniform(0, 2 * np.pi),
+            int(rng.integers(0, len(env._entities))),
+        )
+    env._update_bullets()
+    return env._update_bullets
+
+
+def render_case() -> Callable[[], None]:
+    env = _make_env(render_mode="rgb_array")
+    for action in np.random.default_rng(SEED).integers(0, 2, (500, 7)):
+        env.step(action)
+    return env.render
+
+
+def subproc_case(
+    num_cpu: int = 4, shared_memory: bool = False
+) -> tuple[Callable[[], None], Callable[[], None]]:
+    """
+    End-to-end ``SubprocVecEnv`` stepping as in ``main.py``, or
+    ``SharedMemoryVecEnv`` stepping with every worker pinned to its own core.
+    """
+    from stable_baselines3.common.vec_env import SubprocVecEnv
+
+    from main import make_env
+    from topdown_shooter.envs.shared_memory_vec_env import SharedMemoryVecEnv
+
+    # The "module:" prefix makes workers import topdown_shooter themselves, as
+    # they may not share this process' main module (e.g. under pytest).
+    env_id = "topdown_shooter:topdown_shooter/TopdownShooter-v0"
+    env_fns = [make_env(env_id, i, SEED) for i in range(num_cpu)]
+    if shared_memory:
+        vec_env = SharedMemoryVecEnv(env_fns, cpu_affinity=True)
+    else:
+        vec_env = SubprocVecEnv(env_fns)
+    vec_env.reset()
+    actions = itertools.cycle(
+        np.random.default_rng(SEED).integers(0, 2, (4096, num_cpu, 7))
+    )
+    return lambda: vec_env.step(next(actions)), vec_env.close
+
+
+def _loop_train_step(trainer, state, action, reward, next_state, done):
+    """``QTrainer.train_step`` before it was vectorized, for comparison."""
+    import torch
+
+    state = torch.tensor(state, dtype=torch.float)
+    reward = torch.tensor(reward, dtype=torch.float)
+    pred = trainer.model(state)
+    target = pred.clone()
+    for i in range(len(done)):
+        if done[i]:
+            target[i] = reward[i]
+        else:
+            target[i] = reward[i] + trainer.gamma * target[i]
+    trainer.optimizer.zero_grad()
+    loss = trainer.criterion(target, pred)
+    loss.backward()
+    trainer.optimizer.step()
+
+
+def train_step_case(loop: bool = False, batch_size: int = 1000) -> Callable[[], None]:
+    """One ``QTrainer`` update on a batch of the AI's shape, as in ``AI.py``."""
+    import torch
+
+    from model import QTrainer
+    from ppo import ActorPPO
+
+    state_size, action_size = ai_sizes()
+    torch.manual_seed(SEED)
+    model = ActorPPO(state_size, action_size, torch.device("cpu"))
+    trainer = QTrainer(model, lr=0.01, gamma=0.9)
+    rng = np.random.default_rng(SEED)
+    batch = (
+        rng.random((batch_size, state_size), dtype=np.float32),
+        rng.random((batch_size, action_size), dtype=np.float32),
+        rng.random(batch_size, dtype=np.float32),
+        rng.random((batch_size, state_size), dtype=np.float32),
+        rng.random(batch_size) < 0.01,
+    )
+    if loop:
+        return lambda: _loop_train_step(trainer, *batch)
+    return lambda: trainer.train_step(*batch)
+
+
+def _time(fn: Callable[[], None], number: int, repeat: int = 5) -> float:
+    """Returns the best seconds per call over ``repeat`` runs of ``number`` calls."""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _result(seconds: float, **params) -> dict:
+    return {"seconds_per_call": seconds, "calls_per_second": 1 / seconds, **params}
+
+
+def run(number: int = 1000, workers: bool = False) -> dict:
+    results = {
+        "step": _result(_time(step_case(), number)),
+        "step_allocations": step_allocations(number),
+        "reset": _result(_time(reset_case(), number)),
+        "get_obs": _result(_time(get_obs_case(), number)),
+        "render_rgb_array": _result(_time(render_case(), number // 10)),
+    }
+    if kernels.NUMBA_AVAILABLE:
+        results["step[numba]"] = _result(_time(step_case("numba"), number))
+    for num_bullets in BULLET_COUNTS:
+        results[f"update_bullets[{num_bullets}]"] = _result(
+            _time(update_bullets_case(num_bullets), number // 10),
+            num_bullets=num_bullets,
+        )
+
+    try:
+        results["train_step"] = _result(_time(train_step_case(), number // 10))
+        results["train_step[loop]"] = _result(
+            _time(train_step_case(loop=True), number // 10)
+        )
+    except ImportError as e:
+        results["train_step"] = {"skipped": str(e)}
+
+    cases = [("subproc_vec_env", 4, False)]
+    if workers:
+        cases += [(f"shared_memory_vec_env[{n}]", n, True) for n in worker_counts()]
+    for name, num_cpu, shared_memory in cases:
+        try:
+            step, close = subproc_case(num_cpu, shared_memory)
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}
+            continue
+        try:
+            results[name] = _result(
+                _time(step, number // 10),
+                num_envs=num_cpu,
+                env_steps_per_call=num_cpu,
+            )
+        finally:
+            close()
+
+    return {
+        "seed": SEED,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def test_step(benchmark):
+    benchmark(step_case())
+
+
+def test_step_numba(benchmark):
+    pytest.importorskip("numba")
+    benchmark(step_case("numba"))
+
+
+def test_step_allocations(benchmark):
+    benchmark.extra_info.update(step_allocations(200))
+    benchmark(step_case())
+
+
+def test_reset(benchmark):
+    benchmark(reset_case())
+
+
+def test_get_obs(benchmark):
+    benchmark(get_obs_case())
+
+
+def test_render_rgb_array(benchmark):
+    benchmark(render_case())
+
+
+@pytest.mark.parametrize("num_bullets", BULLET_COUNTS)
+def test_update_bullets(benchmark, num_bullets):
+    benchmark(update_bullets_case(num_bullets))
+
+
+def test_train_step(benchmark):
+    pytest.importorskip("torch")
+    benchmark(train_step_case())
+
+
+def test_train_step_loop(benchmark):
+    pytest.importorskip("torch")
+    benchmark(train_step_case(loop=True))
+
+
+def test_subproc_vec_env(benchmark):
+    pytest.importorskip("stable_baselines3")
+    step, close = subproc_case()
+    try:
+        benchmark(step)
+    finally:
+        close()
+
+
+@pytest.mark.skipif(
+    not workers_requested(),
+    reason=f"set {WORKERS_ENV_VAR}=1 to run the worker scaling cases",
+)
+@pytest.mark.parametrize("num_cpu", worker_counts())
+def test_shared_memory_vec_env(benchmark, num_cpu):
+    pytest.importorskip("stable_baselines3")
+    step, close = subproc_case(num_cpu, shared_memory=True)
+    try:
+        benchmark(step)
+    finally:
+        close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument(
+        "--workers",
+        action="store_true",
+        help="also run the SharedMemoryVecEnv worker scaling cases",
+    )
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.number, args.workers or workers_requested()), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    print(report)
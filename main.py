@@ -1,9 +1,9 @@
 import gymnasium as gym
-from stable_baselines3 import PPO
 from stable_baselines3.common.utils import set_random_seed
-from stable_baselines3.common.vec_env import SubprocVecEnv
 
 import topdown_shooter  # noqa
+from rollout import PipelinedPPO
+from topdown_shooter.envs.shared_memory_vec_env import SharedMemoryVecEnv
 
 
 def make_env(env_id: str, rank: int, seed: int = 0):
@@ -29,9 +29,9 @@ def main():
     env_id = "topdown_shooter/TopdownShooter-v0"
     num_cpu = 4
 
-    vec_env = SubprocVecEnv([make_env(env_id, i) for i in range(num_cpu)])
+    vec_env = SharedMemoryVecEnv([make_env(env_id, i) for i in range(num_cpu)])
 
-    model = PPO("MlpPolicy", vec_env, verbose=1)
+    model = PipelinedPPO("MlpPolicy", vec_env, verbose=1)
     model.learn(total_timesteps=40000)
     model.save("topdown_shooter_model")
 
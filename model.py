@@ -1,5 +1,7 @@
+import copy
 import os
 
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional
@@ -26,36 +28,83 @@ class LinearNet(nn.Module):
 
 
 class QTrainer:
-    def __init__(self, model, lr, gamma):
+    """
+    Batched DQN updates with a target network.
+
+    ``action`` gives the action taken in each transition, either as an index
+    or as a vector over the model's outputs whose argmax is that action, such
+    as a one-hot or the raw outputs it was chosen from (not post-processed
+    moves, whose scaled mouse coordinates would dominate the argmax). The model's prediction for
+    that action is regressed on ``reward + gamma * (1 - done) *
+    max(target_model(next_state))``, computed for the whole batch in one
+    tensor expression. The target network is a copy of ``model`` refreshed
+    every ``target_update`` steps. ``compile`` runs both networks through
+    ``torch.compile`` and ``inference_mode`` computes the targets under
+    ``torch.inference_mode`` instead of ``torch.no_grad``.
+    """
+
+    def __init__(
+        self,
+        model,
+        lr,
+        gamma,
+        target_update: int = 100,
+        compile: bool = False,
+        inference_mode: bool = False,
+    ):
         self.lr = lr
         self.gamma = gamma
         self.model = model
+        self.target_model = copy.deepcopy(model)
+        self.target_model.requires_grad_(False)
+        self.target_update = target_update
+        self.inference_mode = inference_mode
+        self.steps = 0
         self.optimizer = optim.Adam(self.model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
+        self._forward = torch.compile(self.model) if compile else self.model
+        self._target_forward = (
+            torch.compile(self.target_model) if compile else self.target_model
+        )
+
+    def _tensor(self, value, dtype=torch.float) -> torch.Tensor:
+        device = next(self.model.parameters()).device
+        return torch.as_tensor(np.asarray(value), dtype=dtype, device=device)
+
+    def _target(self, reward, next_state, done) -> torch.Tensor:
+        context = torch.inference_mode if self.inference_mode else torch.no_grad
+        with context():
+            next_q = self._target_forward(next_state).max(dim=1).values
+            target = reward + self.gamma * ~done * next_q
+        # Inference tensors cannot be saved for backward, a copy can.
+        return target.clone() if self.inference_mode else target
 
     def train_step(self, state, action, reward, next_state, done):
-        state = torch.tensor(state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.float)
-        reward = torch.tensor(reward, dtype=torch.float)
+        state = self._tensor(state)
+        action = self._tensor(action)
+        reward = self._tensor(reward)
+        next_state = self._tensor(next_state)
+        done = self._tensor(done, dtype=torch.bool)
 
         if len(state.shape) == 1:
             state = torch.unsqueeze(state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done,)
+            next_state = torch.unsqueeze(next_state, 0)
+            done = torch.unsqueeze(done, 0)
+        if action.ndim == 2:
+            action = action.argmax(dim=1)
 
-        pred = self.model(state)
-
-        target = pred.clone()
-
-        for i in range(len(done)):
-            if done[i]:
-                target[i] = reward[i]
-            else:
-                target[i] = reward[i] + self.gamma * target[i]
+        target = self._target(reward, next_state, done)
+        pred = self._forward(state).gather(1, action.long()[:, None])[:, 0]
 
         self.optimizer.zero_grad()
-        loss = self.criterion(target, pred)
+        loss = self.criterion(pred, target)
         loss.backward()
 
         self.optimizer.step()
+
+        self.steps += 1
+        if self.steps % self.target_update == 0:
+            self.target_model.load_state_dict(self.model.state_dict())
+        return loss.item()
@@ -1,5 +1,4 @@
 import os
-import random as rd
 
 import numpy as np
 import torch
@@ -24,6 +23,7 @@ class ActorPPO(nn.Module):
         self.critic = nn.MSELoss()
         self.critic.to(self.device)
         self.optimizer = torch.optim.Adam(self.net.parameters(), lr=0.001)
+        self._host_inputs: torch.Tensor | None = None
 
     def forward(self, state):
         if isinstance(state, np.ndarray):
@@ -33,11 +33,32 @@ class ActorPPO(nn.Module):
         return self.net(state)
 
     def act(self, state, eps=0.1) -> np.ndarray:
-        state = torch.from_numpy(state).float().to(self.device)
-        action = self.net(state)
-        if rd.random() < eps:
-            action = torch.rand(self.action_dim).to(self.device)
-        return action.detach().cpu().numpy()
+        return self.act_batch(state[None], eps)[0]
+
+    def act_batch(self, states, eps=0.1) -> np.ndarray:
+        """
+        Actions for a ``(B, state_dim)`` batch of states, without autograd.
+        Each row is replaced by a uniform random action with probability
+        ``eps``.
+        """
+        states = np.asarray(states, dtype=np.float32).reshape(-1, self.state_dim)
+        with torch.inference_mode():
+            actions = self.net(self._inputs(states))
+            explore = torch.rand(len(states), 1, device=self.device) < eps
+            actions = torch.where(explore, torch.rand_like(actions), actions)
+        return actions.cpu().numpy()
+
+    def _inputs(self, states: np.ndarray) -> torch.Tensor:
+        if self.device.type != "cuda":
+            return torch.from_numpy(states)
+        # Stage the batch in a reused pinned buffer for an async host copy.
+        if self._host_inputs is None or len(self._host_inputs) < len(states):
+            self._host_inputs = torch.empty(
+                (len(states), self.state_dim), pin_memory=True
+            )
+        host = self._host_inputs[: len(states)]
+        host.numpy()[...] = states
+        return host.to(self.device, non_blocking=True)
 
     def update(self, state, action, reward, next_state, done):
         state = torch.from_numpy(state).float().to(self.device)
@@ -0,0 +1,65 @@
+"""
+Replays an episode recorded with ``TrajectoryRecorder``.
+
+The frames are drawn from the recorded state, without simulating the game::
+
+    python replay.py recordings/episode_000000.tds
+    python replay.py recordings/episode_000000.tds --start 500 --output frames.npy
+"""
+
+import argparse
+
+import numpy as np
+
+from topdown_shooter.envs.recording import TrajectoryReader
+from topdown_shooter.envs.rendering import Rasterizer
+
+
+def render_frames(reader: TrajectoryReader, start: int = 0, stop: int | None = None):
+    """Yields the RGB frames of ticks ``start`` to ``stop`` of a recording."""
+    rasterizer = Rasterizer(tuple(reader.metadata["arena_size"]))
+    radius = reader.metadata["bullet_radius"]
+    for tick in range(start, len(reader) if stop is None else stop):
+        state = reader[tick]
+        yield rasterizer.draw_world(
+            state["x"],
+            state["y"],
+            state["health"],
+            state["bullet_x"],
+            state["bullet_y"],
+            radius,
+        )
+
+
+def show(frames, fps: int):
+    import pygame
+
+    pygame.init()
+    window = None
+    clock = pygame.time.Clock()
+    for frame in frames:
+        if window is None:
+            window = pygame.display.set_mode(frame.shape[1::-1])
+            pygame.display.set_caption("TopDownShooter replay")
+        pygame.surfarray.blit_array(window, frame.swapaxes(0, 1))
+        pygame.event.pump()
+        pygame.display.update()
+        clock.tick(fps)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("path")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--output", help="save the frames to this .npy file instead")
+    args = parser.parse_args()
+
+    with TrajectoryReader(args.path) as reader:
+        frames = render_frames(reader, args.start, args.stop)
+        if args.output:
+            np.save(args.output, np.stack([frame.copy() for frame in frames]))
+        else:
+            show(frames, args.fps)
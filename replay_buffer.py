@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions stored in preallocated arrays.
+
+    ``append`` writes one transition in place and ``sample`` gathers a batch
+    with one fancy index per field, so batches come out as contiguous
+    ``float32`` arrays ready for ``torch.from_numpy``. With ``path`` the
+    arrays are ``.npy`` memory maps in that directory, for buffers that do
+    not fit in RAM.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        state_dim: int,
+        action_dim: int,
+        path: str | None = None,
+        seed: int | None = None,
+    ):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.states = self._array(path, "states", (capacity, state_dim), np.float32)
+        self.actions = self._array(path, "actions", (capacity, action_dim), np.float32)
+        self.rewards = self._array(path, "rewards", (capacity,), np.float32)
+        self.next_states = self._array(
+            path, "next_states", (capacity, state_dim), np.float32
+        )
+        self.dones = self._array(path, "dones", (capacity,), bool)
+        self._next = 0
+        self._size = 0
+
+    @staticmethod
+    def _array(path: str | None, name: str, shape: tuple, dtype) -> np.ndarray:
+        if path is None:
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(path, exist_ok=True)
+        return np.lib.format.open_memmap(
+            os.path.join(path, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape
+        )
+
+    def __len__(self):
+        return self._size
+
+    def append(self, state, action, reward, next_state, done) -> int:
+        """Stores a transition, overwriting the oldest one when full."""
+        index = self._next
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return index
+
+    def _indices(self, batch_size: int) -> np.ndarray:
+        if self._size <= batch_size:
+            return np.arange(self._size)
+        return self.rng.integers(0, self._size, batch_size)
+
+    def get(self, indices: np.ndarray) -> tuple[np.ndarray, ...]:
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+        )
+
+    def sample(self, batch_size: int) -> tuple[np.ndarray, ...]:
+        """
+        Returns ``(states, actions, rewards, next_states, dones)`` for
+        ``batch_size`` transitions drawn uniformly with replacement, or for the
+        whole buffer if it holds fewer.
+        """
+        return self.get(self._indices(batch_size))
+
+
+class SumTree:
+    """
+    Binary tree over ``capacity`` priorities stored in one array, where each
+    node holds the sum of its children. Updates and prefix-sum lookups work
+    on whole batches of leaves, one tree level per array operation.
+    """
+
+    def __init__(self, capacity: int):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.tree = np.zeros(2 * self.leaves)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        nodes = np.asarray(indices) + self.leaves
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Returns the leaf whose prefix-sum interval contains each value."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.intp)
+        while nodes[0] < self.leaves:
+            left = 2 * nodes
+            go_right = values >= self.tree[left]
+            values -= np.where(go_right, self.tree[left], 0)
+            nodes = left + go_right
+        return nodes - self.leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay: transitions are drawn with probability
+    ``priority ** alpha`` and :meth:`sample` also returns importance weights
+    and the sampled indices for :meth:`update_priorities`. New transitions
+    get the highest priority seen so far.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        state_dim: int,
+        action_dim: int,
+        alpha: float = 0.6,
+        path: str | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(capacity, state_dim, action_dim, path=path, seed=seed)
+        self.alpha = alpha
+        self.tree = SumTree(capacity)
+        self._max_priority = 1.0
+
+    def append(self, state, action, reward, next_state, done) -> int:
+        index = super().append(state, action, reward, next_state, done)
+        self.tree.update(np.array([index]), self._max_priority**self.alpha)
+        return index
+
+    def sample(self, batch_size: int, beta: float = 0.4) -> tuple[np.ndarray, ...]:
+        """
+        Returns ``(states, actions, rewards, next_states, dones, weights,
+        indices)``. ``weights`` are the importance-sampling corrections for
+        ``beta``, normalized to a maximum of 1.
+        """
+        # One value per equal slice of the total priority mass.
+        bounds = np.linspace(0, self.tree.total, batch_size + 1)
+        values = self.rng.uniform(bounds[:-1], bounds[1:])
+        indices = np.minimum(self.tree.find(values), self._size - 1)
+
+        probabilities = self.tree.tree[indices + self.tree.leaves] / self.tree.total
+        weights = (self._size * probabilities) ** -beta
+        weights = (weights / weights.max()).astype(np.float32)
+        return self.get(indices) + (weights, indices)
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray):
+        priorities = np.abs(priorities) + 1e-6
+        self._max_priority = max(self._max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities**self.alpha)
@@ -0,0 +1,227 @@
+"""
+Pipelined rollout collection for PPO.
+
+``PipelinedPPO`` splits the training envs into two groups and keeps one of
+them stepping while the policy runs on the other, so the env workers and the
+policy take turns instead of waiting for each other. It needs a vec env that
+can step a subset of its envs, such as ``SharedMemoryVecEnv``; with any other
+vec env it collects rollouts like ``PPO``.
+"""
+
+import time
+
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from stable_baselines3.common.buffers import RolloutBuffer
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.utils import obs_as_tensor
+from stable_baselines3.common.vec_env import VecEnv
+
+
+class PipelineStats:
+    """
+    Wall time of one rollout split into policy inference and time spent
+    blocked on env workers. The lower ``env_wait_fraction``, the more of the
+    env stepping was hidden behind inference.
+    """
+
+    def __init__(self):
+        self.inference = 0.0
+        self.env_wait = 0.0
+        self.steps = 0
+        self._start = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        wall = max(time.perf_counter() - self._start, 1e-9)
+        return {
+            "wall_time": wall,
+            "inference_time": self.inference,
+            "env_wait_time": self.env_wait,
+            "inference_fraction": self.inference / wall,
+            "env_wait_fraction": self.env_wait / wall,
+            "env_steps_per_second": self.steps / wall,
+        }
+
+
+class PipelinedPPO(PPO):
+    """
+    ``PPO`` with double-buffered rollout collection.
+
+    The envs are split into two halves. While one half steps in its worker
+    processes, the policy computes the actions of the other half, so each
+    rollout row takes about ``max(inference, env step)`` per half instead of
+    their sum. Transitions land in the rollout buffer exactly as with
+    ``PPO.collect_rollouts``. The last rollout's timings are kept in
+    ``pipeline_stats`` and logged under ``pipeline/``.
+
+    Unlike ``PPO``, it defaults to ``device="cpu"``, so the collector stays
+    on the CPU even when CUDA is available.
+    """
+
+    pipeline_stats: dict = {}
+
+    def __init__(self, *args, device: th.device | str = "cpu", **kwargs):
+        super().__init__(*args, device=device, **kwargs)
+
+    def collect_rollouts(
+        self,
+        env: VecEnv,
+        callback: BaseCallback,
+        rollout_buffer: RolloutBuffer,
+        n_rollout_steps: int,
+    ) -> bool:
+        if env.num_envs < 2 or not hasattr(env, "step_indices_async"):
+            return super().collect_rollouts(
+                env, callback, rollout_buffer, n_rollout_steps
+            )
+
+        assert self._last_obs is not None, "No previous observation was provided"
+        self.policy.set_training_mode(False)
+
+        n_steps = 0
+        rollout_buffer.reset()
+        if self.use_sde:
+            self.policy.reset_noise(env.num_envs)
+
+        callback.on_rollout_start()
+
+        half = env.num_envs // 2
+        groups = (np.arange(half), np.arange(half, env.num_envs))
+        stats = PipelineStats()
+        actions = np.zeros(
+            (env.num_envs,) + self._action_shape(), dtype=self.action_space.dtype
+        )
+        clipped_actions = np.zeros_like(actions)
+        values = th.zeros(env.num_envs, 1, device=self.device)
+        log_probs = th.zeros(env.num_envs, device=self.device)
+        new_obs = np.zeros_like(self._last_obs)
+        rewards = np.zeros(env.num_envs, dtype=np.float32)
+        dones = np.zeros(env.num_envs, dtype=bool)
+        infos: list[dict] = [{} for _ in range(env.num_envs)]
+
+        def infer(group: np.ndarray, obs: np.ndarray):
+            start = time.perf_counter()
+            group_actions, group_clipped, group_values, group_log_probs = self._infer(
+                obs
+            )
+            actions[group] = group_actions.reshape(actions[group].shape)
+            clipped_actions[group] = group_clipped.reshape(actions[group].shape)
+            values[group] = group_values
+            log_probs[group] = group_log_probs
+            stats.inference += time.perf_counter() - start
+
+        def wait(group: np.ndarray):
+            start = time.perf_counter()
+            obs, group_rewards, group_dones, group_infos = env.step_indices_wait(group)
+            stats.env_wait += time.perf_counter() - start
+            new_obs[group] = obs
+            rewards[group] = group_rewards
+            dones[group] = group_dones
+            for env_idx, info in zip(group, group_infos):
+                infos[env_idx] = info
+
+        first, second = groups
+        infer(first, self._last_obs[first])
+        env.step_indices_async(clipped_actions[first], first)
+
+        while n_steps < n_rollout_steps:
+            if (
+                self.use_sde
+                and self.sde_sample_freq > 0
+                and n_steps % self.sde_sample_freq == 0
+            ):
+                self.policy.reset_noise(env.num_envs)
+
+            # The second half infers while the first half steps, and the
+            # first half of the next row infers while the second half steps.
+            infer(second, self._last_obs[second])
+            env.step_indices_async(clipped_actions[second], second)
+            wait(first)
+            row_actions = actions.copy()
+            row_values = values.clone()
+            row_log_probs = log_probs.clone()
+            if n_steps + 1 < n_rollout_steps:
+                infer(first, new_obs[first])
+                env.step_indices_async(clipped_actions[first], first)
+            wait(second)
+
+            self.num_timesteps += env.num_envs
+            stats.steps += env.num_envs
+
+            callback.update_locals(locals())
+            if not callback.on_step():
+                if n_steps + 1 < n_rollout_steps:
+                    wait(first)
+                    self._last_obs = new_obs.copy()
+                    self._last_episode_starts = dones.copy()
+                return False
+
+            self._update_info_buffer(infos, dones)
+            n_steps += 1
+
+            if isinstance(self.action_space, spaces.Discrete):
+                row_actions = row_actions.reshape(-1, 1)
+
+            # Handle timeout by bootstrapping with value function
+            for idx in np.flatnonzero(dones):
+                if infos[idx].get("terminal_observation") is not None and infos[
+                    idx
+                ].get("TimeLimit.truncated", False):
+                    terminal_obs = self.policy.obs_to_tensor(
+                        infos[idx]["terminal_observation"]
+                    )[0]
+                    with th.no_grad():
+                        terminal_value = self.policy.predict_values(terminal_obs)[0]
+                    rewards[idx] += self.gamma * terminal_value
+
+            rollout_buffer.add(
+                self._last_obs,
+                row_actions,
+                rewards,
+                self._last_episode_starts,
+                row_values,
+                row_log_probs,
+            )
+            self._last_obs = new_obs.copy()
+            self._last_episode_starts = dones.copy()
+
+        with th.no_grad():
+            last_values = self.policy.predict_values(
+                obs_as_tensor(self._last_obs, self.device)
+            )
+
+        rollout_buffer.compute_returns_and_advantage(
+            last_values=last_values, dones=self._last_episode_starts
+        )
+
+        self.pipeline_stats = stats.to_dict()
+        for key, value in self.pipeline_stats.items():
+            self.logger.record(f"pipeline/{key}", value)
+
+        callback.update_locals(locals())
+        callback.on_rollout_end()
+
+        return True
+
+    def _action_shape(self) -> tuple[int, ...]:
+        if isinstance(self.action_space, spaces.Discrete):
+            return ()
+        return self.action_space.shape
+
+    def _infer(self, obs: np.ndarray):
+        with th.no_grad():
+            obs_tensor = obs_as_tensor(obs, self.device)
+            actions, values, log_probs = self.policy(obs_tensor)
+        actions = actions.cpu().numpy()
+
+        clipped_actions = actions
+        if isinstance(self.action_space, spaces.Box):
+            if self.policy.squash_output:
+                clipped_actions = self.policy.unscale_action(clipped_actions)
+            else:
+                clipped_actions = np.clip(
+                    actions, self.action_space.low, self.action_space.high
+                )
+        return actions, clipped_actions, values, log_probs
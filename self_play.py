@@ -0,0 +1,60 @@
+"""
+Self-play for TopDownShooterEnv.
+
+The opponents of every training env are driven by a frozen copy of the policy
+being trained. ``SelfPlayCallback`` refreshes that copy in all envs every
+``update_freq`` steps. Each env evaluates it once per step on the batched
+observations of all its opponents.
+"""
+
+import copy
+
+import numpy as np
+from stable_baselines3.common.base_class import BaseAlgorithm
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class PolicySnapshot:
+    """
+    Frozen CPU copy of a model's policy, callable on a batch of observations.
+
+    :param model: the model whose current policy is copied
+    :param deterministic: whether the opponents take the most likely actions
+    """
+
+    def __init__(self, model: BaseAlgorithm, deterministic: bool = False):
+        self.policy = copy.deepcopy(model.policy).to("cpu")
+        self.policy.set_training_mode(False)
+        self.deterministic = deterministic
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        actions, _ = self.policy.predict(observations, deterministic=self.deterministic)
+        return actions
+
+
+class SelfPlayCallback(BaseCallback):
+    """
+    Sends a fresh ``PolicySnapshot`` of the model to the opponents of every
+    env at the start of training and then every ``update_freq`` calls.
+    """
+
+    def __init__(
+        self, update_freq: int = 10_000, deterministic: bool = False, verbose=0
+    ):
+        super().__init__(verbose)
+        self.update_freq = update_freq
+        self.deterministic = deterministic
+
+    def _update_opponents(self):
+        snapshot = PolicySnapshot(self.model, self.deterministic)
+        self.training_env.env_method("set_opponent_policy", snapshot)
+        if self.verbose > 0:
+            print(f"Updated the opponents' policy at step {self.num_timesteps}")
+
+    def _on_training_start(self) -> None:
+        self._update_opponents()
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.update_freq == 0:
+            self._update_opponents()
+        return True
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from topdown_shooter.envs import TopDownShooterEnv
+
+SEED = 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"opponent_difficulty": "normal"},
+        {"opponent_difficulty": "expert"},
+        {"opponent_difficulty": "hard", "num_players": 31},
+    ],
+)
+def test_numba_backend_matches_numpy(kwargs):
+    pytest.importorskip("numba")
+    reference = TopDownShooterEnv(backend="numpy", **kwargs)
+    compiled = TopDownShooterEnv(backend="numba", **kwargs)
+    assert compiled.backend == "numba"
+
+    obs, _ = reference.reset(seed=SEED)
+    compiled_obs, _ = compiled.reset(seed=SEED)
+    assert np.array_equal(obs, compiled_obs)
+
+    actions = np.random.default_rng(SEED).integers(0, 2, (3000, 7))
+    for step, action in enumerate(actions):
+        obs, reward, terminated, _, _ = reference.step(action)
+        compiled_obs, compiled_reward, compiled_terminated, _, _ = compiled.step(action)
+        assert np.array_equal(obs, compiled_obs), f"obs differ at step {step}"
+        assert reward == compiled_reward, f"rewards differ at step {step}"
+        assert terminated == compiled_terminated, f"terminated differs at step {step}"
+        if terminated:
+            reference.reset()
+            compiled.reset()
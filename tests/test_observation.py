@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from gymnasium import spaces
+
+from topdown_shooter.envs import TopDownShooterEnv
+
+SEED = 0
+
+
+def _flatten_obs(env: TopDownShooterEnv) -> np.ndarray:
+    """The observation built as nested dicts and flattened by ``spaces.flatten``."""
+    near_bullets = [env._bullets[i].to_dict() for i in env._get_near_bullets()]
+    padding = {"x": 0, "y": 0, "angle": 0}
+    near_bullets += [padding] * (env.max_observed_bullets - len(near_bullets))
+    return spaces.flatten(
+        env._observation_space,
+        {
+            "you": env._agent.to_dict(),
+            "players": tuple(player.to_dict() for player in env._players),
+            "near_bullets": tuple(near_bullets),
+            "cooldown": env._agent.cooldown,
+        },
+    )
+
+
+@pytest.mark.parametrize("zero_copy_obs", [False, True])
+def test_encoder_matches_spaces_flatten(zero_copy_obs):
+    env = TopDownShooterEnv(zero_copy_obs=zero_copy_obs)
+    obs, _ = env.reset(seed=SEED)
+    expected = _flatten_obs(env)
+    assert obs.dtype == expected.dtype
+    assert np.array_equal(obs, expected)
+
+    actions = np.random.default_rng(SEED).integers(0, 2, (3000, 7))
+    for action in actions:
+        obs, _, terminated, truncated, _ = env.step(action)
+        expected = _flatten_obs(env)
+        assert obs.dtype == expected.dtype
+        assert np.array_equal(obs, expected)
+        if terminated or truncated:
+            env.reset()
+
+
+def test_zero_copy_returns_the_buffer():
+    env = TopDownShooterEnv(zero_copy_obs=True)
+    obs, _ = env.reset(seed=SEED)
+    assert np.shares_memory(obs, env.step(np.zeros(7, dtype=np.int64))[0])
+
+    env = TopDownShooterEnv(zero_copy_obs=False)
+    obs, _ = env.reset(seed=SEED)
+    assert not np.shares_memory(obs, env.step(np.zeros(7, dtype=np.int64))[0])
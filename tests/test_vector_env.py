@@ -0,0 +1,61 @@
+import numpy as np
+
+from topdown_shooter.envs import TopDownShooterEnv, TopDownShooterVectorEnv
+
+SEED = 0
+
+
+def test_autoreset_keeps_the_final_observation():
+    envs = TopDownShooterVectorEnv(4, max_episode_steps=3)
+    unlimited = TopDownShooterVectorEnv(4)
+    envs.reset(seed=SEED)
+    unlimited.reset(seed=SEED)
+
+    actions = np.random.default_rng(SEED).integers(0, 2, (3, 4, 7))
+    for action in actions:
+        obs, _, terminated, truncated, info = envs.step(action)
+        expected, *_ = unlimited.step(action)
+
+    assert truncated.all() and not terminated.any()
+    assert info["_final_observation"].all()
+    for i, final_obs in enumerate(info["final_observation"]):
+        assert not np.shares_memory(final_obs, obs)
+        assert np.array_equal(final_obs, expected[i])
+    assert (envs._elapsed_steps == 0).all()
+    assert np.array_equal(obs, envs._get_obs())
+    assert not np.array_equal(obs, expected)
+
+
+def test_observation_layout_matches_single_env():
+    env = TopDownShooterEnv()
+    env.reset(seed=SEED)
+    for action in np.random.default_rng(SEED).integers(0, 2, (200, 7)):
+        env.step(action)
+    players = env._entities
+    pool = env._bullets
+    rng = np.random.default_rng(SEED)
+    for _ in range(2 * env.max_observed_bullets):
+        pool.spawn(
+            rng.uniform(0, env.window_size[0]),
+            rng.uniform(0, env.window_size[1]),
+            rng.uniform(0, 2 * np.pi),
+        )
+    n = len(pool)
+
+    envs = TopDownShooterVectorEnv(2)
+    envs.reset(seed=SEED)
+    envs._x[0] = players.x
+    envs._y[0] = players.y
+    envs._angle[0] = players.angle
+    envs._health[0] = players.health
+    envs._cooldown[0] = players.cooldown
+    envs._bullet_alive[0] = False
+    envs._bullet_alive[0, :n] = True
+    envs._bullet_x[0, :n] = pool.x[:n]
+    envs._bullet_y[0, :n] = pool.y[:n]
+    envs._bullet_angle[0, :n] = pool.angle[:n]
+
+    obs = envs._get_obs()[0]
+    expected = env._get_obs()
+    assert obs.dtype == expected.dtype
+    assert np.array_equal(obs, expected)
@@ -1,7 +1,10 @@
 from gymnasium.envs.registration import register
 
+# max_episode_steps counts step() calls. With frame_skip=k an episode lasts up
+# to k * 3000 ticks, pass max_episode_ticks to bound the simulated time instead.
 register(
     id="topdown_shooter/TopdownShooter-v0",
     entry_point="topdown_shooter.envs:TopDownShooterEnv",
+    vector_entry_point="topdown_shooter.envs:TopDownShooterVectorEnv",
     max_episode_steps=3000,
 )
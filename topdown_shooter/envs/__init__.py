@@ -1 +1,2 @@
 from topdown_shooter.envs.topdown_shooter import TopDownShooterEnv
+from topdown_shooter.envs.topdown_shooter_vector import TopDownShooterVectorEnv
@@ -0,0 +1,260 @@
+import math
+
+import numpy as np
+
+
+class PlayerStore:
+    """
+    Preallocated arrays holding the state of every player in a match.
+
+    The float fields are rows of the single ``state`` matrix, in the order of
+    ``fields``, so the whole store can be copied in one operation.
+    """
+
+    fields = ("x", "y", "angle", "health", "cooldown", "score")
+
+    def __init__(self, size: int):
+        self.state = np.zeros((len(self.fields), size))
+        self.x, self.y, self.angle, self.health, self.cooldown, self.score = self.state
+        self.direction = np.zeros((size, 2), dtype=np.int64)
+        self.time_to_next_action = np.zeros(size)
+        self._views = [Player(self, i) for i in range(size)]
+
+    def __len__(self):
+        return len(self._views)
+
+    def __getitem__(self, index):
+        return self._views[index]
+
+
+class Player:
+    __slots__ = ("_store", "index")
+
+    def __init__(self, store: PlayerStore, index: int):
+        self._store = store
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return self._store.x.item(self.index)
+
+    @x.setter
+    def x(self, value: float):
+        self._store.x[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return self._store.y.item(self.index)
+
+    @y.setter
+    def y(self, value: float):
+        self._store.y[self.index] = value
+
+    @property
+    def angle(self) -> float:
+        return self._store.angle.item(self.index)
+
+    @angle.setter
+    def angle(self, value: float):
+        self._store.angle[self.index] = value
+
+    @property
+    def health(self) -> float:
+        return self._store.health.item(self.index)
+
+    @health.setter
+    def health(self, value: float):
+        self._store.health[self.index] = value
+
+    @property
+    def cooldown(self) -> float:
+        return self._store.cooldown.item(self.index)
+
+    @cooldown.setter
+    def cooldown(self, value: float):
+        self._store.cooldown[self.index] = value
+
+    @property
+    def score(self) -> float:
+        return self._store.score.item(self.index)
+
+    @score.setter
+    def score(self, value: float):
+        self._store.score[self.index] = value
+
+    @property
+    def direction(self) -> tuple[int, int]:
+        dx, dy = self._store.direction[self.index]
+        return int(dx), int(dy)
+
+    @direction.setter
+    def direction(self, value: tuple[int, int]):
+        self._store.direction[self.index] = value
+
+    @property
+    def time_to_next_action(self) -> float:
+        return self._store.time_to_next_action.item(self.index)
+
+    @time_to_next_action.setter
+    def time_to_next_action(self, value: float):
+        self._store.time_to_next_action[self.index] = value
+
+    def distance(self, other):
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+    def to_dict(self):
+        return {
+            "x": self.x,
+            "y": self.y,
+            "angle": self.angle,
+            "health": self.health,
+        }
+
+
+class BulletPool:
+    """
+    Dense, fixed-capacity bullet arrays.
+
+    Live bullets always occupy slots ``[0, len(pool))`` in firing order, so
+    per-step updates are plain slices. :meth:`remove` compacts the survivors
+    in one pass and :meth:`spawn` appends, dropping the shot once
+    ``capacity`` bullets are in flight. Iterating the pool yields a
+    :class:`Bullet` view for every live slot.
+    """
+
+    def __init__(
+        self,
+        players: PlayerStore,
+        capacity: int = 64,
+        radius: float = 5,
+        speed: float = 4,
+        damage: float = 10,
+    ):
+        self.players = players
+        self.capacity = capacity
+        self.radius = radius
+        self.speed = speed
+        self.damage = damage
+        # x, y and angle are the rows of one matrix, like in PlayerStore.
+        self.state = np.zeros((3, capacity))
+        self.x, self.y, self.angle = self.state
+        self.owner = np.full(capacity, -1, dtype=np.int64)
+        self._views = [Bullet(self, i) for i in range(capacity)]
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int) -> "Bullet":
+        return self._views[index]
+
+    def __iter__(self):
+        return iter(self._views[: self._count])
+
+    def spawn(
+        self, x: float, y: float, angle: float, owner: int = -1
+    ) -> "Bullet | None":
+        index = self._count
+        if index == self.capacity:
+            return None
+        self.x[index] = x
+        self.y[index] = y
+        self.angle[index] = angle
+        self.owner[index] = owner
+        self._count += 1
+        return self._views[index]
+
+    def spawn_many(
+        self, x: np.ndarray, y: np.ndarray, angle: np.ndarray, owner: np.ndarray
+    ) -> int:
+        """
+        Appends one bullet per entry, in order, dropping the shots that do not
+        fit in ``capacity``. Returns how many were spawned.
+        """
+        start = self._count
+        n = min(len(owner), self.capacity - start)
+        end = start + n
+        self.x[start:end] = x[:n]
+        self.y[start:end] = y[:n]
+        self.angle[start:end] = angle[:n]
+        self.owner[start:end] = owner[:n]
+        self._count = end
+        return n
+
+    def remove(self, mask: np.ndarray):
+        """Removes the live bullets for which ``mask`` is set, keeping order."""
+        n = self._count
+        keep = ~mask[:n]
+        m = int(keep.sum())
+        self.state[:, :m] = self.state[:, :n][:, keep]
+        self.owner[:m] = self.owner[:n][keep]
+        self._count = m
+
+    def clear(self):
+        self._count = 0
+
+    def resize(self, count: int):
+        """Sets the live count after the arrays were updated in place."""
+        self._count = count
+
+
+class Bullet:
+    __slots__ = ("_pool", "index")
+
+    def __init__(self, pool: BulletPool, index: int):
+        self._pool = pool
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return self._pool.x.item(self.index)
+
+    @x.setter
+    def x(self, value: float):
+        self._pool.x[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return self._pool.y.item(self.index)
+
+    @y.setter
+    def y(self, value: float):
+        self._pool.y[self.index] = value
+
+    @property
+    def angle(self) -> float:
+        return self._pool.angle.item(self.index)
+
+    @angle.setter
+    def angle(self, value: float):
+        self._pool.angle[self.index] = value
+
+    @property
+    def radius(self) -> float:
+        return self._pool.radius
+
+    @property
+    def speed(self) -> float:
+        return self._pool.speed
+
+    @property
+    def damage(self) -> float:
+        return self._pool.damage
+
+    @property
+    def player(self) -> Player | None:
+        owner = self._pool.owner.item(self.index)
+        return None if owner < 0 else self._pool.players[owner]
+
+    def distance(self, other):
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+    def collides_with(self, other):
+        return self.distance(other) < self.radius
+
+    def to_dict(self):
+        return {
+            "x": self.x,
+            "y": self.y,
+            "angle": self.angle,
+        }
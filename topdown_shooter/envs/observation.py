@@ -0,0 +1,231 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from topdown_shooter.envs.entities import BulletPool, PlayerStore
+
+
+def _leaf_offsets(space: spaces.Space, path=(), offset=0):
+    """Yields ``(path, offset)`` for every leaf of ``space`` in flattening order."""
+    if isinstance(space, spaces.Dict):
+        items = space.spaces.items()
+    elif isinstance(space, spaces.Tuple):
+        items = enumerate(space.spaces)
+    else:
+        yield path, offset
+        return
+    for key, subspace in items:
+        yield from _leaf_offsets(subspace, path + (key,), offset)
+        offset += spaces.flatdim(subspace)
+
+
+class ObservationEncoder:
+    """
+    Writes observations straight into a preallocated buffer.
+
+    The offset of every field is computed once from the nested observation
+    space, so encoding is a handful of array assignments and gives the same
+    result as ``spaces.flatten`` over the equivalent nested dict. With
+    ``copy=False`` :meth:`encode` returns the internal buffer itself, which is
+    overwritten by the next call. :meth:`encode_all` encodes the observation
+    of every player from its own point of view at once.
+    """
+
+    player_fields = ("x", "y", "angle", "health")
+    bullet_fields = ("x", "y", "angle")
+
+    def __init__(self, observation_space: spaces.Dict, copy: bool = True):
+        self.copy = copy
+        self.buffer = np.zeros(
+            spaces.flatdim(observation_space),
+            dtype=spaces.flatten_space(observation_space).dtype,
+        )
+
+        offsets = dict(_leaf_offsets(observation_space))
+        num_players = len(observation_space["players"])
+        num_bullets = len(observation_space["near_bullets"])
+        self._cooldown = offsets[("cooldown",)]
+        self._you = {field: offsets[("you", field)] for field in self.player_fields}
+        self._players = {
+            field: np.array(
+                [offsets[("players", i, field)] for i in range(num_players)]
+            )
+            for field in self.player_fields
+        }
+        self._bullets = {
+            field: np.array(
+                [offsets[("near_bullets", i, field)] for i in range(num_bullets)]
+            )
+            for field in self.bullet_fields
+        }
+        # Row i lists the players observed by player i: everyone but itself.
+        everyone = np.arange(num_players + 1)
+        self._others = np.array([np.delete(everyone, i) for i in everyone])
+
+    def encode(
+        self, players: PlayerStore, bullets: BulletPool, near_bullets: np.ndarray
+    ) -> np.ndarray:
+        """
+        :param players: store whose slot 0 is the agent and the rest opponents
+        :param bullets: bullet pool
+        :param near_bullets: pool indices of the observed bullets, in order
+        """
+        buffer = self._write(players, bullets, near_bullets)
+        return buffer.copy() if self.copy else buffer
+
+    def _write(
+        self, players: PlayerStore, bullets: BulletPool, near_bullets: np.ndarray
+    ) -> np.ndarray:
+        buffer = self.buffer
+        buffer[self._cooldown] = players.cooldown[0]
+        for field, index in self._you.items():
+            buffer[index] = getattr(players, field)[0]
+        for field, index in self._players.items():
+            buffer[index] = getattr(players, field)[1:]
+
+        n = len(near_bullets)
+        for field, index in self._bullets.items():
+            buffer[index[:n]] = getattr(bullets, field)[near_bullets]
+            buffer[index[n:]] = 0
+        return buffer
+
+    def encode_all(
+        self,
+        players: PlayerStore,
+        bullets: BulletPool,
+        near_bullets: np.ndarray,
+        observed: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Returns one observation row per player of ``players``; row 0 equals
+        :meth:`encode`.
+
+        :param players: store whose slot 0 is the agent and the rest opponents
+        :param bullets: bullet pool
+        :param near_bullets: pool indices of the bullets observed by each
+            player, one row per player, in order
+        :param observed: which entries of ``near_bullets`` are bullets
+        """
+        out = np.zeros((len(players),) + self.buffer.shape, dtype=self.buffer.dtype)
+        out[:, self._cooldown] = players.cooldown
+        for field, index in self._you.items():
+            out[:, index] = getattr(players, field)
+        for field, index in self._players.items():
+            out[:, index] = getattr(players, field)[self._others]
+        for field, index in self._bullets.items():
+            out[:, index] = np.where(observed, getattr(bullets, field)[near_bullets], 0)
+        return out
+
+
+class CompactObservationEncoder(ObservationEncoder):
+    """
+    Encodes the same fields as :class:`ObservationEncoder`, scaled to
+    ``[-1, 1]``.
+
+    The agent's own position is relative to the arena, the positions of the
+    other players and of the bullets are relative to the agent, angles are
+    mapped from ``[0, 2 pi]`` and health from ``[0, 100]``. Unobserved bullets
+    are all zeros. ``dtype`` may be ``float32``, ``float16`` or ``int16``, in
+    which case values are quantized to ``[-32767, 32767]``. Multiplying by
+    ``scale`` maps the output back to ``[-1, 1]``: int16 observations are meant
+    for storage and transfer, and a policy should see them through
+    :class:`DequantizeObservation`.
+    """
+
+    def __init__(
+        self,
+        observation_space: spaces.Dict,
+        window_size: tuple[float, float],
+        dtype=np.float32,
+        copy: bool = True,
+    ):
+        super().__init__(observation_space, copy=copy)
+        self.dtype = np.dtype(dtype)
+        assert self.dtype in (np.float32, np.float16, np.int16)
+        size = len(self.buffer)
+        self._scale = np.zeros(size)
+        self._offset = np.zeros(size)
+        self._relative_x = np.zeros(size)
+        self._relative_y = np.zeros(size)
+
+        width, height = window_size
+        self._scale[self._cooldown] = 4
+        self._offset[self._cooldown] = -1
+        groups = [(self._you, False), (self._players, True), (self._bullets, True)]
+        for fields, relative in groups:
+            for field, index in fields.items():
+                if field == "angle":
+                    self._scale[index], self._offset[index] = 1 / np.pi, -1
+                elif field == "health":
+                    self._scale[index], self._offset[index] = 1 / 50, -1
+                elif relative:
+                    extent = width if field == "x" else height
+                    self._scale[index] = 1 / extent
+                    if field == "x":
+                        self._relative_x[index] = 1 / extent
+                    else:
+                        self._relative_y[index] = 1 / extent
+                else:
+                    extent = width if field == "x" else height
+                    self._scale[index], self._offset[index] = 2 / extent, -1
+        self._padding = np.stack(list(self._bullets.values()), axis=1)
+
+        self.output = np.zeros(size, dtype=self.dtype)
+        self.scale = 1 / 32767 if self.dtype == np.int16 else 1.0
+        if self.dtype == np.int16:
+            self.observation_space = spaces.Box(
+                low=-32767, high=32767, shape=(size,), dtype=np.int16
+            )
+        else:
+            self.observation_space = spaces.Box(
+                low=-1, high=1, shape=(size,), dtype=self.dtype
+            )
+
+    def _compact(self, raw: np.ndarray, you_x, you_y, out: np.ndarray):
+        values = raw * self._scale + self._offset
+        values -= np.multiply.outer(you_x, self._relative_x)
+        values -= np.multiply.outer(you_y, self._relative_y)
+        np.clip(values, -1, 1, out=values)
+        if self.dtype == np.int16:
+            np.rint(values * 32767, out=values)
+        out[...] = values
+
+    def encode(
+        self, players: PlayerStore, bullets: BulletPool, near_bullets: np.ndarray
+    ) -> np.ndarray:
+        raw = self._write(players, bullets, near_bullets)
+        self._compact(raw, players.x[0], players.y[0], self.output)
+        self.output[self._padding[len(near_bullets) :].ravel()] = 0
+        return self.output.copy() if self.copy else self.output
+
+    def encode_all(
+        self,
+        players: PlayerStore,
+        bullets: BulletPool,
+        near_bullets: np.ndarray,
+        observed: np.ndarray,
+    ) -> np.ndarray:
+        raw = super().encode_all(players, bullets, near_bullets, observed)
+        out = np.empty(raw.shape, dtype=self.dtype)
+        self._compact(raw, players.x, players.y, out)
+        for index in self._bullets.values():
+            out[:, index] *= observed
+        return out
+
+
+class DequantizeObservation(gym.ObservationWrapper):
+    """
+    Maps the observations of an env in compact mode back to ``float32`` in
+    ``[-1, 1]``, so that e.g. SB3 policies get normalized inputs from an env
+    with ``observation_dtype=np.int16``.
+    """
+
+    def __init__(self, env: gym.Env):
+        super().__init__(env)
+        self.scale = np.float32(env.unwrapped.observation_scale)
+        self.observation_space = spaces.Box(
+            low=-1, high=1, shape=env.observation_space.shape, dtype=np.float32
+        )
+
+    def observation(self, observation: np.ndarray) -> np.ndarray:
+        return np.multiply(observation, self.scale, dtype=np.float32)
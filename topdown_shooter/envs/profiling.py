@@ -0,0 +1,87 @@
+import os
+from time import perf_counter
+from typing import Iterable
+
+PROFILE_ENV_VAR = "TOPDOWN_SHOOTER_PROFILE"
+
+
+def profiling_requested() -> bool:
+    return os.environ.get(PROFILE_ENV_VAR, "").lower() not in ("", "0", "false")
+
+
+class StepProfiler:
+    """
+    Per-phase wall time and event counters for ``TopDownShooterEnv.step``.
+
+    :meth:`begin` starts a step, every :meth:`lap` charges the time since the
+    previous lap to a phase and :meth:`end` folds the step into the running
+    totals returned by :meth:`summary`.
+    """
+
+    def __init__(self):
+        self.steps = 0
+        self.timings: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._timing_totals: dict[str, float] = {}
+        self._counter_totals: dict[str, int] = {}
+        self._last = 0.0
+
+    def begin(self):
+        self.timings = {}
+        self.counters = {}
+        self._last = perf_counter()
+
+    def lap(self, phase: str):
+        now = perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def end(self) -> dict:
+        """Returns this step's timings and counters."""
+        self.steps += 1
+        for phase, seconds in self.timings.items():
+            self._timing_totals[phase] = self._timing_totals.get(phase, 0.0) + seconds
+        for name, n in self.counters.items():
+            self._counter_totals[name] = self._counter_totals.get(name, 0) + n
+        return {"timings": self.timings, "counters": self.counters}
+
+    def summary(self) -> dict:
+        return summarize(
+            [
+                {
+                    "steps": self.steps,
+                    "timings": self._timing_totals,
+                    "counters": self._counter_totals,
+                }
+            ]
+        )
+
+
+def summarize(summaries: Iterable[dict]) -> dict:
+    """
+    Aggregates :meth:`StepProfiler.summary` results, e.g. from every worker of a
+    ``SubprocVecEnv`` with ``summarize(vec_env.env_method("get_profile"))``.
+    """
+    steps = 0
+    timings: dict[str, float] = {}
+    counters: dict[str, int] = {}
+    for summary in summaries:
+        if summary is None:
+            continue
+        steps += summary["steps"]
+        for phase, seconds in summary["timings"].items():
+            timings[phase] = timings.get(phase, 0.0) + seconds
+        for name, n in summary["counters"].items():
+            counters[name] = counters.get(name, 0) + n
+
+    per_step = max(steps, 1)
+    return {
+        "steps": steps,
+        "timings": timings,
+        "counters": counters,
+        "mean_timings": {phase: t / per_step for phase, t in timings.items()},
+        "mean_counters": {name: n / per_step for name, n in counters.items()},
+    }
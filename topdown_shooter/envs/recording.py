@@ -0,0 +1,293 @@
+"""
+Episode recordings for TopDownShooterEnv.
+
+A recording file holds one episode as a sequence of chunks of
+``chunk_size`` ticks. Each chunk stores every column separately and
+zlib-compressed, and a JSON footer lists where every column of every chunk
+lives. :class:`TrajectoryReader` memory-maps a file and finds the chunk of
+any tick directly from the footer, so seeking costs the same wherever the
+tick is and only the columns that are read get decompressed.
+
+Per tick, a recording holds the state of every player and bullet after the
+tick, the action that led to it and its reward. Tick 0 is the state after
+``reset()``, with a zero action and reward. With ``frame_skip > 1`` every tick
+of a step is recorded, each with the step's action, and ``frame_skip`` is kept
+in the metadata.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, SupportsFloat
+
+import gymnasium as gym
+import numpy as np
+
+MAGIC = b"TDSREC01"
+_FOOTER = struct.Struct("<Q8s")
+
+PLAYER_COLUMNS = ("x", "y", "angle", "health", "cooldown")
+BULLET_COLUMNS = ("bullet_x", "bullet_y", "bullet_angle", "bullet_owner")
+
+
+class TrajectoryWriter:
+    """
+    Streams the ticks of one episode to ``path``.
+
+    Ticks are buffered in preallocated arrays and a chunk is compressed and
+    written every ``chunk_size`` ticks. The file is only readable after
+    :meth:`close`, which writes the footer.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        num_players: int,
+        max_bullets: int,
+        metadata: dict | None = None,
+        chunk_size: int = 256,
+        compression_level: int = 1,
+    ):
+        self.path = os.fspath(path)
+        self.chunk_size = chunk_size
+        self.compression_level = compression_level
+        self.metadata = {
+            **(metadata or {}),
+            "num_players": num_players,
+            "chunk_size": chunk_size,
+        }
+        self.ticks = 0
+        self._chunks: list[dict] = []
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+
+        self._players = np.zeros(
+            (chunk_size, len(PLAYER_COLUMNS), num_players), dtype=np.float32
+        )
+        self._action = np.zeros((chunk_size, 7), dtype=np.int8)
+        self._reward = np.zeros(chunk_size, dtype=np.float32)
+        self._terminated = np.zeros(chunk_size, dtype=bool)
+        self._bullet_count = np.zeros(chunk_size, dtype=np.int32)
+        self._bullets = np.zeros((3, chunk_size * max_bullets), dtype=np.float32)
+        self._bullet_owner = np.zeros(chunk_size * max_bullets, dtype=np.int16)
+        self._row = 0
+        self._bullet_row = 0
+
+    def write(self, env, action=None, reward: SupportsFloat = 0, terminated=False):
+        """Appends the current state of ``env`` as the next tick."""
+        row = self._row
+        # PLAYER_COLUMNS are the leading rows of PlayerStore.state.
+        self._players[row] = env._entities.state[: len(PLAYER_COLUMNS)]
+        self._action[row] = 0 if action is None else action
+        self._reward[row] = reward
+        self._terminated[row] = terminated
+
+        pool = env._bullets
+        n = len(pool)
+        self._bullet_count[row] = n
+        start, end = self._bullet_row, self._bullet_row + n
+        self._bullets[:, start:end] = pool.state[:, :n]
+        self._bullet_owner[start:end] = pool.owner[:n]
+        self._bullet_row = end
+
+        self._row += 1
+        self.ticks += 1
+        if self._row == self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        rows = self._row
+        if rows == 0:
+            return
+        columns = {
+            column: self._players[:rows, i] for i, column in enumerate(PLAYER_COLUMNS)
+        }
+        columns["action"] = self._action[:rows]
+        columns["reward"] = self._reward[:rows]
+        columns["terminated"] = self._terminated[:rows]
+        columns["bullet_count"] = self._bullet_count[:rows]
+        for i, column in enumerate(BULLET_COLUMNS[:3]):
+            columns[column] = self._bullets[i, : self._bullet_row]
+        columns["bullet_owner"] = self._bullet_owner[: self._bullet_row]
+
+        chunk = {"ticks": rows, "columns": {}}
+        for column, values in columns.items():
+            data = zlib.compress(values.tobytes(), self.compression_level)
+            chunk["columns"][column] = [
+                self._file.tell(),
+                len(data),
+                values.dtype.str,
+                list(values.shape),
+            ]
+            self._file.write(data)
+        self._chunks.append(chunk)
+        self._row = 0
+        self._bullet_row = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush()
+        footer = json.dumps(
+            {"metadata": self.metadata, "ticks": self.ticks, "chunks": self._chunks}
+        ).encode()
+        self._file.write(footer)
+        self._file.write(_FOOTER.pack(len(footer), MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Random access to a recording written by :class:`TrajectoryWriter`.
+
+    ``reader[tick]`` returns the state of one tick as a dict of arrays and
+    :meth:`column` a whole per-tick column, e.g. for offline RL. The last
+    decompressed chunk is cached, so reading ticks in order decompresses
+    every chunk once.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a recording")
+        length, magic = _FOOTER.unpack(self._mmap[-_FOOTER.size :])
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is incomplete, its writer was not closed")
+        start = len(self._mmap) - _FOOTER.size - length
+        footer = json.loads(self._mmap[start : start + length])
+        self.metadata: dict = footer["metadata"]
+        self.ticks: int = footer["ticks"]
+        self.chunk_size: int = self.metadata["chunk_size"]
+        self._chunks: list[dict] = footer["chunks"]
+        self._cache: tuple[int, dict[str, np.ndarray]] = (-1, {})
+
+    def __len__(self) -> int:
+        return self.ticks
+
+    def _read(self, chunk: int, column: str) -> np.ndarray:
+        if self._cache[0] != chunk:
+            self._cache = (chunk, {})
+        cached = self._cache[1]
+        if column not in cached:
+            offset, length, dtype, shape = self._chunks[chunk]["columns"][column]
+            data = zlib.decompress(self._mmap[offset : offset + length])
+            cached[column] = np.frombuffer(data, dtype=dtype).reshape(shape)
+        return cached[column]
+
+    def _bullet_offsets(self, chunk: int) -> np.ndarray:
+        """Where the bullets of every tick of ``chunk`` start, and the end."""
+        counts = self._read(chunk, "bullet_count")
+        cached = self._cache[1]
+        if "bullet_offsets" not in cached:
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            cached["bullet_offsets"] = offsets
+        return cached["bullet_offsets"]
+
+    def __getitem__(self, tick: int) -> dict[str, Any]:
+        if tick < 0:
+            tick += self.ticks
+        if not 0 <= tick < self.ticks:
+            raise IndexError(f"tick {tick} out of range")
+        chunk, row = divmod(tick, self.chunk_size)
+
+        state = {
+            column: self._read(chunk, column)[row]
+            for column in PLAYER_COLUMNS + ("action", "reward", "terminated")
+        }
+        offsets = self._bullet_offsets(chunk)
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        for column in BULLET_COLUMNS:
+            state[column] = self._read(chunk, column)[start:end]
+        return state
+
+    def column(self, name: str) -> np.ndarray:
+        """Concatenates a per-tick column over the whole episode."""
+        assert name not in BULLET_COLUMNS, "bullet columns are ragged"
+        return np.concatenate(
+            [self._read(chunk, name) for chunk in range(len(self._chunks))]
+        )
+
+    def close(self):
+        self._cache = (-1, {})
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """
+    Records every episode of a ``TopDownShooterEnv`` to
+    ``directory/episode_{n:06d}.tds``, tick by tick through the env's
+    ``tick_callback``.
+
+    :param env: the env to record, possibly wrapped
+    :param directory: where the recordings are written
+    :param chunk_size: ticks per compressed chunk
+    """
+
+    def __init__(self, env: gym.Env, directory: str | os.PathLike, chunk_size=256):
+        super().__init__(env)
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.episode = 0
+        self._writer: TrajectoryWriter | None = None
+        self.env.unwrapped.tick_callback = self._record_tick
+
+    def _start_episode(self):
+        self._close_episode()
+        game = self.env.unwrapped
+        path = os.path.join(self.directory, f"episode_{self.episode:06d}.tds")
+        self._writer = TrajectoryWriter(
+            path,
+            num_players=len(game._entities),
+            max_bullets=game._bullets.capacity,
+            metadata={
+                "arena_size": list(game.window_size),
+                "bullet_radius": game._bullets.radius,
+                "frame_skip": game.frame_skip,
+            },
+            chunk_size=self.chunk_size,
+        )
+        self.episode += 1
+
+    def _close_episode(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self._start_episode()
+        self._writer.write(self.env.unwrapped)
+        return obs, info
+
+    def _record_tick(self, action, reward: float, terminated: bool):
+        if self._writer is not None:
+            self._writer.write(self.env.unwrapped, action, reward, terminated)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        if terminated or truncated:
+            self._close_episode()
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self._close_episode()
+        self.env.unwrapped.tick_callback = None
+        super().close()
@@ -0,0 +1,93 @@
+import numpy as np
+
+_RGB = np.dtype((np.void, 3))
+
+
+def _luminance(color: tuple[int, int, int]) -> int:
+    r, g, b = color
+    return round(0.299 * r + 0.587 * g + 0.114 * b)
+
+
+class Rasterizer:
+    """
+    Draws filled disks into a reusable ``uint8`` frame without pygame.
+
+    Each disk size has a precomputed list of pixel offsets, so drawing ``n``
+    disks is a single scatter of ``n * len(offsets)`` pixels. ``scale``
+    downsamples the frame by an integer factor and ``grayscale`` produces a
+    single-channel ``(height, width)`` frame instead of RGB.
+    """
+
+    def __init__(self, size: tuple[int, int], scale: int = 1, grayscale: bool = False):
+        self.scale = scale
+        self.grayscale = grayscale
+        self.width = size[0] // scale
+        self.height = size[1] // scale
+        if grayscale:
+            self.frame = np.zeros((self.height, self.width), dtype=np.uint8)
+            self._pixels = self.frame.reshape(-1)
+        else:
+            self.frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            # One 3-byte element per pixel: scattering whole pixels is much
+            # faster than broadcasting a color over the channel axis.
+            self._pixels = self.frame.view(_RGB).reshape(-1)
+        self._disks: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+        self._backgrounds: dict[tuple[int, int, int], np.ndarray] = {}
+
+    def _disk(self, radius: float) -> tuple[np.ndarray, np.ndarray]:
+        if radius not in self._disks:
+            r = max(radius / self.scale, 0.5)
+            span = np.arange(-int(np.ceil(r)), int(np.ceil(r)) + 1)
+            dy, dx = np.meshgrid(span, span, indexing="ij")
+            inside = dx * dx + dy * dy <= r * r
+            self._disks[radius] = dy[inside], dx[inside]
+        return self._disks[radius]
+
+    def _pixel(self, color: tuple[int, int, int]):
+        if self.grayscale:
+            return np.uint8(_luminance(color))
+        return np.array(color, dtype=np.uint8).view(_RGB)[0]
+
+    def clear(self, color: tuple[int, int, int] = (255, 255, 255)):
+        if color not in self._backgrounds:
+            background = np.empty_like(self._pixels)
+            background[...] = self._pixel(color)
+            self._backgrounds[color] = background
+        np.copyto(self._pixels, self._backgrounds[color])
+
+    def draw_disks(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        radius: float,
+        color: tuple[int, int, int],
+    ):
+        if len(x) == 0:
+            return
+        dy, dx = self._disk(radius)
+        cx = (np.asarray(x) / self.scale).astype(np.intp)
+        cy = (np.asarray(y) / self.scale).astype(np.intp)
+        rows = (cy[:, None] + dy).ravel()
+        cols = (cx[:, None] + dx).ravel()
+        inside = (rows >= 0) & (rows < self.height) & (cols >= 0) & (cols < self.width)
+        self._pixels[rows[inside] * self.width + cols[inside]] = self._pixel(color)
+
+    def draw_world(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        health: np.ndarray,
+        bullet_x: np.ndarray,
+        bullet_y: np.ndarray,
+        bullet_radius: float,
+    ) -> np.ndarray:
+        """
+        Draws a whole arena: the agent at index 0 of the player arrays, the
+        living opponents after it and the bullets. Returns the frame.
+        """
+        self.clear((255, 255, 255))
+        opponents = np.flatnonzero(health[1:] > 0) + 1
+        self.draw_disks(x[:1], y[:1], 5, (0, 0, 100))
+        self.draw_disks(x[opponents], y[opponents], 5, (100, 0, 0))
+        self.draw_disks(bullet_x, bullet_y, bullet_radius, (0, 0, 0))
+        return self.frame
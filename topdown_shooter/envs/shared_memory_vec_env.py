@@ -0,0 +1,254 @@
+import multiprocessing as mp
+import os
+from collections.abc import Callable
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env.base_vec_env import (
+    CloudpickleWrapper,
+    VecEnv,
+    VecEnvIndices,
+    VecEnvObs,
+    VecEnvStepReturn,
+)
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+
+class _SharedArray:
+    """A NumPy array backed by a ``SharedMemory`` block, attachable by name."""
+
+    def __init__(self, shape, dtype, name: str | None = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.shm = SharedMemory(name=name, create=name is None, size=size)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def spec(self) -> tuple:
+        return self.shape, self.dtype.str, self.shm.name
+
+    @classmethod
+    def attach(cls, spec: tuple) -> "_SharedArray":
+        shape, dtype, name = spec
+        return cls(shape, dtype, name)
+
+
+def _worker(
+    remote: mp.connection.Connection,
+    parent_remote: mp.connection.Connection,
+    env_fn_wrapper: CloudpickleWrapper,
+    index: int,
+    cpu: int | None,
+) -> None:
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    env = _patch_env(env_fn_wrapper.var())
+    remote.send((env.observation_space, env.action_space))
+    buffers = {key: _SharedArray.attach(spec) for key, spec in remote.recv().items()}
+    obs = buffers["obs"].array[index]
+    terminal_obs = buffers["terminal_obs"].array[index]
+    actions = buffers["actions"].array
+    rewards = buffers["rewards"].array
+    dones = buffers["dones"].array
+    truncations = buffers["truncations"].array
+
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(
+                    actions[index]
+                )
+                done = terminated or truncated
+                reset_info = None
+                if done:
+                    terminal_obs[...] = observation
+                    observation, reset_info = env.reset()
+                obs[...] = observation
+                rewards[index] = reward
+                dones[index] = done
+                truncations[index] = truncated and not terminated
+                remote.send((info or None, reset_info or None))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                obs[...] = observation
+                remote.send(reset_info)
+            elif cmd == "render":
+                remote.send(env.render())
+            elif cmd == "close":
+                env.close()
+                remote.close()
+                break
+            elif cmd == "env_method":
+                method = env.get_wrapper_attr(data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(env.get_wrapper_attr(data))
+            elif cmd == "has_attr":
+                try:
+                    env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+    for buffer in buffers.values():
+        buffer.shm.close()
+
+
+class SharedMemoryVecEnv(SubprocVecEnv):
+    """
+    ``SubprocVecEnv`` whose workers exchange data through shared memory.
+
+    Actions, observations, rewards and done flags live in
+    ``multiprocessing.shared_memory`` arrays that workers read and write in
+    place. Each step only sends a short command to every worker and waits for
+    its acknowledgement, which carries the info dict when it is not empty.
+
+    :param env_fns: Environments to run in subprocesses
+    :param start_method: see ``SubprocVecEnv``
+    :param cpu_affinity: pin worker ``i`` to ``cpu_affinity[i]``, or to core
+        ``i % os.cpu_count()`` if ``True``. Only supported on Linux.
+    """
+
+    def __init__(
+        self,
+        env_fns: list[Callable[[], gym.Env]],
+        start_method: str | None = None,
+        cpu_affinity: bool | list[int] | None = None,
+    ):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+
+        if cpu_affinity is True:
+            cpu_affinity = [i % os.cpu_count() for i in range(n_envs)]
+        elif not cpu_affinity:
+            cpu_affinity = [None] * n_envs
+
+        if start_method is None:
+            forkserver_available = "forkserver" in mp.get_all_start_methods()
+            start_method = "forkserver" if forkserver_available else "spawn"
+        ctx = mp.get_context(start_method)
+        # Workers must share this process' resource tracker, otherwise their
+        # own tracker unlinks the blocks they attached to when they exit.
+        resource_tracker.ensure_running()
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for index, (work_remote, remote, env_fn, cpu) in enumerate(
+            zip(self.work_remotes, self.remotes, env_fns, cpu_affinity)
+        ):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), index, cpu)
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        observation_space, action_space = self.remotes[0].recv()
+        for remote in self.remotes[1:]:
+            remote.recv()
+        assert isinstance(observation_space, spaces.Box)
+
+        self._buffers = {
+            "obs": _SharedArray(
+                (n_envs,) + observation_space.shape, observation_space.dtype
+            ),
+            "terminal_obs": _SharedArray(
+                (n_envs,) + observation_space.shape, observation_space.dtype
+            ),
+            "actions": _SharedArray((n_envs,) + action_space.shape, action_space.dtype),
+            "rewards": _SharedArray((n_envs,), np.float32),
+            "dones": _SharedArray((n_envs,), bool),
+            "truncations": _SharedArray((n_envs,), bool),
+        }
+        specs = {key: buffer.spec() for key, buffer in self._buffers.items()}
+        for remote in self.remotes:
+            remote.send(specs)
+
+        self._pending = np.zeros(n_envs, dtype=bool)
+
+        VecEnv.__init__(self, n_envs, observation_space, action_space)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.step_indices_async(actions)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        return self.step_indices_wait()
+
+    def step_indices_async(
+        self, actions: np.ndarray, indices: VecEnvIndices = None
+    ) -> None:
+        """
+        Starts stepping only the envs in ``indices`` with ``actions``, one row
+        per env. Different groups of envs may be in flight at the same time.
+        """
+        indices = list(self._get_indices(indices))
+        self._buffers["actions"].array[indices] = np.reshape(
+            actions, (len(indices),) + self.action_space.shape
+        )
+        for remote in self._get_target_remotes(indices):
+            remote.send(("step", None))
+        self._pending[indices] = True
+        self.waiting = True
+
+    def step_indices_wait(self, indices: VecEnvIndices = None) -> VecEnvStepReturn:
+        """Waits for the envs in ``indices`` and returns their step results."""
+        indices = list(self._get_indices(indices))
+        results = [remote.recv() for remote in self._get_target_remotes(indices)]
+        self._pending[indices] = False
+        self.waiting = bool(self._pending.any())
+
+        dones = self._buffers["dones"].array[indices]
+        truncations = self._buffers["truncations"].array
+        terminal_obs = self._buffers["terminal_obs"].array
+        infos: list[dict[str, Any]] = []
+        for env_idx, done, (info, reset_info) in zip(indices, dones, results):
+            info = info or {}
+            info["TimeLimit.truncated"] = bool(truncations[env_idx])
+            if done:
+                info["terminal_observation"] = terminal_obs[env_idx].copy()
+            infos.append(info)
+            self.reset_infos[env_idx] = reset_info or {}
+
+        return (
+            self._buffers["obs"].array[indices],
+            self._buffers["rewards"].array[indices],
+            dones,
+            infos,
+        )
+
+    def reset(self) -> VecEnvObs:
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        self._reset_seeds()
+        self._reset_options()
+        return self._buffers["obs"].array.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        for remote in self._get_target_remotes(np.flatnonzero(self._pending)):
+            remote.recv()
+        self.waiting = False
+        super().close()
+        for buffer in self._buffers.values():
+            buffer.shm.close()
+            buffer.shm.unlink()
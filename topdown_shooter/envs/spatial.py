@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class UniformGrid:
+    """
+    Uniform-grid broad phase over a rectangular arena.
+
+    Points are bucketed into square cells of ``cell_size`` with a counting sort
+    in :meth:`build`; :meth:`query` gathers the points in the 3x3 block of cells
+    around each query point and keeps those closer than ``radius``. ``radius``
+    must not exceed ``cell_size``. The grid has a one-cell border so that
+    neighbour lookups never fall outside of it. ``tests`` holds the number of
+    narrow-phase distance checks done by the last query.
+    """
+
+    def __init__(self, size: tuple[float, float], cell_size: float):
+        self.cell_size = cell_size
+        self._width = int(size[0] // cell_size) + 3
+        self._height = int(size[1] // cell_size) + 3
+        self._neighbours = (
+            np.arange(-1, 2)[:, None] * self._height + np.arange(-1, 2)[None, :]
+        ).ravel()
+        self._x = np.zeros(0)
+        self._y = np.zeros(0)
+        self._order = np.zeros(0, dtype=np.intp)
+        self._count = np.zeros(self._width * self._height, dtype=np.intp)
+        self._start = np.zeros(self._width * self._height, dtype=np.intp)
+        self.tests = 0
+
+    def _cell(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        cx = (x // self.cell_size).astype(np.intp) + 1
+        cy = (y // self.cell_size).astype(np.intp) + 1
+        return cx * self._height + cy
+
+    def build(self, x: np.ndarray, y: np.ndarray, mask: np.ndarray):
+        """Indexes the points ``(x[i], y[i])`` for which ``mask[i]`` is set."""
+        ids = np.flatnonzero(mask)
+        cell = self._cell(x[ids], y[ids])
+        self._x = x
+        self._y = y
+        self._order = ids[np.argsort(cell, kind="stable")]
+        self._count = np.bincount(cell, minlength=len(self._count))
+        self._start = np.cumsum(self._count) - self._count
+
+    def query(
+        self, x: np.ndarray, y: np.ndarray, radius: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns ``(query_index, point_index)`` for every indexed point closer
+        than ``radius`` to a query point.
+        """
+        cell = (self._cell(x, y)[:, None] + self._neighbours).ravel()
+        count = self._count[cell]
+        total = count.sum()
+        self.tests = int(total)
+        if total == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+
+        query_index = np.repeat(np.arange(len(x)).repeat(9), count)
+        first = np.cumsum(count) - count
+        slot = np.repeat(self._start[cell] - first, count) + np.arange(total)
+        point_index = self._order[slot]
+
+        dx = x[query_index] - self._x[point_index]
+        dy = y[query_index] - self._y[point_index]
+        close = dx * dx + dy * dy < radius * radius
+        return query_index[close], point_index[close]
@@ -1,118 +1,138 @@
-from typing import Any, SupportsFloat
+from typing import Any, Callable, SupportsFloat
 
 import gymnasium as gym
 import numpy as np
-import pygame
 from gymnasium import spaces
 from gymnasium.core import ObsType, ActType
-from pydantic import dataclasses
 
-
-@dataclasses.dataclass
-class Player:
-    x: float
-    y: float
-    angle: float
-    health: float
-    cooldown: float = 0
-    score: float = 0
-    direction: tuple[int, int] = (0, 0)
-    time_to_next_action: float = 0
-
-    def distance(self, other):
-        return np.linalg.norm((self.x - other.x, self.y - other.y), 2)
-
-    def to_dict(self):
-        return {
-            "x": self.x,
-            "y": self.y,
-            "angle": self.angle,
-            "health": self.health,
+from topdown_shooter.envs import kernels
+from topdown_shooter.envs.entities import BulletPool, Player, PlayerStore
+from topdown_shooter.envs.observation import (
+    CompactObservationEncoder,
+    ObservationEncoder,
+)
+from topdown_shooter.envs.profiling import StepProfiler, profiling_requested
+from topdown_shooter.envs.rendering import Rasterizer
+from topdown_shooter.envs.spatial import UniformGrid
+
+
+def make_observation_space(
+    window_size: tuple[int, int], num_players: int = 7, num_bullets: int = 10
+) -> spaces.Dict:
+    return spaces.Dict(
+        {
+            "you": spaces.Dict(
+                {
+                    "x": spaces.Box(low=0, high=window_size[0], shape=(1,)),
+                    "y": spaces.Box(low=0, high=window_size[1], shape=(1,)),
+                    "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
+                    "health": spaces.Box(low=0, high=100, shape=(1,)),
+                }
+            ),
+            "players": spaces.Tuple(
+                [
+                    spaces.Dict(
+                        {
+                            "x": spaces.Box(low=0, high=window_size[0], shape=(1,)),
+                            "y": spaces.Box(low=0, high=window_size[1], shape=(1,)),
+                            "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
+                            "health": spaces.Box(low=0, high=100, shape=(1,)),
+                        }
+                    )
+                ]
+                * num_players,
+            ),
+            "near_bullets": spaces.Tuple(
+                [
+                    spaces.Dict(
+                        {
+                            "x": spaces.Box(low=0, high=window_size[0], shape=(1,)),
+                            "y": spaces.Box(low=0, high=window_size[1], shape=(1,)),
+                            "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
+                        }
+                    )
+                ]
+                * num_bullets,
+            ),
+            "cooldown": spaces.Box(low=0, high=100, shape=(1,)),
         }
+    )
 
 
-@dataclasses.dataclass
-class Bullet:
-    x: float
-    y: float
-    angle: float
-    real: bool = True
-    radius: float = 5
-    speed: float = 4
-    damage: float = 10
-    player: Player | None = None
+_WORD = (1 << 64) - 1
 
-    def distance(self, other):
-        return np.linalg.norm((self.x - other.x, self.y - other.y), 2)
-
-    def collides_with(self, other):
-        return self.distance(other) < self.radius
-
-    def to_dict(self):
-        return {
-            "x": self.x,
-            "y": self.y,
-            "angle": self.angle,
-        }
+# Scripted opponent settings. ``fire_rate`` is the chance to shoot per step.
+# With ``aim`` opponents face their nearest enemy, off by up to
+# ``(1 - accuracy) * pi`` radians, instead of a random direction.
+OPPONENT_DIFFICULTIES = {
+    "easy": {"aim": False, "accuracy": 0.0, "fire_rate": 0.05},
+    "normal": {"aim": False, "accuracy": 0.0, "fire_rate": 0.1},
+    "hard": {"aim": True, "accuracy": 0.7, "fire_rate": 0.1},
+    "expert": {"aim": True, "accuracy": 0.95, "fire_rate": 0.2},
+}
 
 
 class TopDownShooterEnv(gym.Env):
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 30}
 
-    def __init__(self, render_mode=None):
-        self._agent: Player = Player(x=0, y=0, angle=0, health=100)
-        self._players: list[Player] = [
-            Player(x=0, y=0, angle=0, health=100) for _ in range(7)
-        ]
-        self._bullets: list[Bullet] = []
-        self.window_size = (640, 480)
-        self._observation_space = spaces.Dict(
-            {
-                "you": spaces.Dict(
-                    {
-                        "x": spaces.Box(low=0, high=self.window_size[0], shape=(1,)),
-                        "y": spaces.Box(low=0, high=self.window_size[1], shape=(1,)),
-                        "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
-                        "health": spaces.Box(low=0, high=100, shape=(1,)),
-                    }
-                ),
-                "players": spaces.Tuple(
-                    [
-                        spaces.Dict(
-                            {
-                                "x": spaces.Box(
-                                    low=0, high=self.window_size[0], shape=(1,)
-                                ),
-                                "y": spaces.Box(
-                                    low=0, high=self.window_size[1], shape=(1,)
-                                ),
-                                "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
-                                "health": spaces.Box(low=0, high=100, shape=(1,)),
-                            }
-                        )
-                    ]
-                    * 7,
-                ),
-                "near_bullets": spaces.Tuple(
-                    [
-                        spaces.Dict(
-                            {
-                                "x": spaces.Box(
-                                    low=0, high=self.window_size[0], shape=(1,)
-                                ),
-                                "y": spaces.Box(
-                                    low=0, high=self.window_size[1], shape=(1,)
-                                ),
-                                "angle": spaces.Box(low=0, high=2 * np.pi, shape=(1,)),
-                            }
-                        )
-                    ]
-                    * 10,
-                ),
-                "cooldown": spaces.Box(low=0, high=100, shape=(1,)),
-            }
+    def __init__(
+        self,
+        render_mode=None,
+        zero_copy_obs: bool = False,
+        num_players: int = 7,
+        max_observed_bullets: int = 10,
+        arena_size: tuple[int, int] = (640, 480),
+        bullet_speed: float = 4,
+        bullet_damage: float = 10,
+        max_bullets: int | None = None,
+        render_scale: int = 1,
+        render_grayscale: bool = False,
+        profile: bool | None = None,
+        backend: str = "numpy",
+        opponent_policy: Callable[[np.ndarray], np.ndarray] | None = None,
+        opponent_difficulty: str | dict = "normal",
+        frame_skip: int = 1,
+        max_episode_ticks: int | None = None,
+        observation_mode: str = "raw",
+        observation_dtype=np.float32,
+    ):
+        self.num_players = num_players
+        self._entities = PlayerStore(1 + num_players)
+        self._agent: Player = self._entities[0]
+        self._players: list[Player] = self._entities[1:]
+        if max_bullets is None:
+            max_bullets = max(64, 8 * (1 + num_players))
+        self._bullets = BulletPool(
+            self._entities,
+            capacity=max_bullets,
+            speed=bullet_speed,
+            damage=bullet_damage,
+        )
+        self.window_size = tuple(arena_size)
+        self._grid = UniformGrid(self.window_size, cell_size=4 * self._bullets.radius)
+        self.max_observed_bullets = max_observed_bullets
+        self._observation_space = make_observation_space(
+            self.window_size, num_players, max_observed_bullets
         )
-        self.observation_space = spaces.flatten_space(self._observation_space)
+        # "raw" observes positions, angles and health as they are, "compact"
+        # scales them to [-1, 1] with positions relative to the observer.
+        assert observation_mode in ("raw", "compact")
+        self.observation_mode = observation_mode
+        if observation_mode == "compact":
+            self._encoder = CompactObservationEncoder(
+                self._observation_space,
+                self.window_size,
+                dtype=observation_dtype,
+                copy=not zero_copy_obs,
+            )
+            self.observation_space = self._encoder.observation_space
+            self.observation_scale = self._encoder.scale
+        else:
+            self.observation_space = spaces.flatten_space(self._observation_space)
+            self._encoder = ObservationEncoder(
+                self._observation_space, copy=not zero_copy_obs
+            )
+            self.observation_scale = 1.0
 
         self.action_space = spaces.MultiDiscrete(
             [2, 2, 2, 2, 2, 2, 2]
@@ -120,34 +140,104 @@ class TopDownShooterEnv(gym.Env):
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
 
+        self._rasterizer = Rasterizer(
+            self.window_size, scale=render_scale, grayscale=render_grayscale
+        )
         self.window = None
         self.clock = None
 
-    def _get_near_bullets(self):
-        bullets = sorted(
-            self._bullets,
-            key=lambda b: b.distance(self._agent),
-            reverse=True,
-        )[:10]
-
-        for i in range(10 - len(bullets)):
-            bullets.append(Bullet(x=0, y=0, angle=0, real=False))
-
-        return bullets
+        assert backend in ("numpy", "numba")
+        if backend == "numba" and not kernels.NUMBA_AVAILABLE:
+            gym.logger.warn("numba is not installed, using the numpy backend")
+            backend = "numpy"
+        self.backend = backend
+
+        if profile is None:
+            profile = profiling_requested()
+        self._profiler = StepProfiler() if profile else None
+
+        self.opponent_policy = opponent_policy
+        self.set_opponent_difficulty(opponent_difficulty)
+
+        assert frame_skip >= 1
+        self.frame_skip = frame_skip
+        # The registered TimeLimit counts steps, i.e. decisions, so with
+        # frame_skip > 1 only this bounds the simulated time of an episode.
+        self.max_episode_ticks = max_episode_ticks
+        self._elapsed_ticks = 0
+
+        # Called after every tick with the action, the reward of the tick and
+        # whether it ended the episode, e.g. by ``TrajectoryRecorder``.
+        self.tick_callback: Callable[[ActType, float, bool], None] | None = None
+
+    def set_opponent_difficulty(self, difficulty: str | dict):
+        """
+        Configures the scripted opponents with a name of
+        ``OPPONENT_DIFFICULTIES`` or a dict overriding some of the "normal"
+        settings, e.g. to build a curriculum through ``env_method``.
+        """
+        if isinstance(difficulty, str):
+            difficulty = OPPONENT_DIFFICULTIES[difficulty]
+        settings = {**OPPONENT_DIFFICULTIES["normal"], **difficulty}
+        self.opponent_aim = bool(settings["aim"])
+        self.opponent_accuracy = float(settings["accuracy"])
+        self.opponent_fire_rate = float(settings["fire_rate"])
+
+    def set_opponent_policy(
+        self, opponent_policy: Callable[[np.ndarray], np.ndarray] | None
+    ):
+        """
+        Lets ``opponent_policy`` drive the opponents instead of the random
+        walk. It is called once per step with the observations of all
+        opponents, shaped ``(num_players, obs_dim)``, and must return their
+        actions, shaped ``(num_players, 7)``. ``None`` restores the random walk.
+        """
+        self.opponent_policy = opponent_policy
+
+    def _get_near_bullets(self) -> np.ndarray:
+        pool = self._bullets
+        live = np.arange(len(pool))
+        dx = pool.x[live] - self._agent.x
+        dy = pool.y[live] - self._agent.y
+        distance = dx * dx + dy * dy
+        k = self.max_observed_bullets
+        if len(live) > k:
+            nearest = np.argpartition(distance, k - 1)[:k]
+            live, distance = live[nearest], distance[nearest]
+        return live[np.argsort(distance, kind="stable")]
 
     def _get_obs(self):
-        return spaces.flatten(
-            self._observation_space,
-            {
-                "you": self._agent.to_dict(),
-                "players": tuple(map(lambda p: p.to_dict(), self._players)),
-                "near_bullets": tuple(
-                    map(lambda b: b.to_dict(), self._get_near_bullets())
-                ),
-                "cooldown": self._agent.cooldown,
-            },
+        return self._encoder.encode(
+            self._entities, self._bullets, self._get_near_bullets()
         )
 
+    def get_opponent_obs(self) -> np.ndarray:
+        """
+        Observations of every opponent from its own point of view, shaped
+        ``(num_players, obs_dim)``, in the same layout as the agent's.
+        """
+        players = self._entities
+        pool = self._bullets
+        n = len(pool)
+        k = self.max_observed_bullets
+        dx = pool.x[:n] - players.x[1:, None]
+        dy = pool.y[:n] - players.y[1:, None]
+        distance = dx * dx + dy * dy
+        if n > k:
+            nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(n), distance.shape)
+        order = np.argsort(
+            np.take_along_axis(distance, nearest, axis=1), axis=1, kind="stable"
+        )
+        nearest = np.take_along_axis(nearest, order, axis=1)
+
+        near_bullets = np.zeros((len(players), k), dtype=np.intp)
+        near_bullets[1:, : nearest.shape[1]] = nearest
+        observed = np.zeros((len(players), k), dtype=bool)
+        observed[1:, : nearest.shape[1]] = True
+        return self._encoder.encode_all(players, pool, near_bullets, observed)[1:]
+
     def _get_info(self):
         return {}
 
@@ -158,19 +248,23 @@ class TopDownShooterEnv(gym.Env):
     ) -> tuple[ObsType, dict[str, Any]]:
         super().reset(seed=seed)
 
-        self._agent = Player(
-            x=np.random.randint(0, self.window_size[0]),
-            y=np.random.randint(0, self.window_size[1]),
-            angle=0,
-            health=100,
-            cooldown=0,
-        )
-        for player in self._players:
-            player.x = np.random.randint(0, self.window_size[0])
-            player.y = np.random.randint(0, self.window_size[1])
-            player.angle = 0
-            player.health = 100
-            player.cooldown = 0
+        # options={"state": blob} starts from a get_state() blob instead of a
+        # random arena, keeping the current random stream.
+        if options and options.get("state") is not None:
+            self.set_state(options["state"], restore_rng=False)
+        else:
+            players = self._entities
+            size = len(players)
+            players.x[:] = self.np_random.integers(0, self.window_size[0], size)
+            players.y[:] = self.np_random.integers(0, self.window_size[1], size)
+            players.angle[:] = 0
+            players.health[:] = 100
+            players.cooldown[:] = 0
+            players.score[:] = 0
+            players.direction[:] = 0
+            players.time_to_next_action[:] = 0
+            self._bullets.clear()
+        self._elapsed_ticks = 0
 
         obs = self._get_obs()
         info = self._get_info()
@@ -180,6 +274,71 @@ class TopDownShooterEnv(gym.Env):
 
         return obs, info
 
+    def get_state(self) -> bytes:
+        """
+        Snapshot of the whole game, the random stream included, as a compact
+        blob for :meth:`set_state` or ``reset(options={"state": ...})``.
+        """
+        rng = self.np_random.bit_generator.state
+        words = np.array(
+            [
+                rng["state"]["state"] & _WORD,
+                rng["state"]["state"] >> 64,
+                rng["state"]["inc"] & _WORD,
+                rng["state"]["inc"] >> 64,
+                rng["has_uint32"],
+                rng["uinteger"],
+                len(self._bullets),
+                self._elapsed_ticks,
+            ],
+            dtype=np.uint64,
+        )
+        players = self._entities
+        pool = self._bullets
+        n = len(pool)
+        return b"".join(
+            (
+                words.tobytes(),
+                players.state.tobytes(),
+                players.time_to_next_action.tobytes(),
+                players.direction.tobytes(),
+                pool.state[:, :n].tobytes(),
+                pool.owner[:n].tobytes(),
+            )
+        )
+
+    def set_state(self, state: bytes, restore_rng: bool = True):
+        """
+        Restores a :meth:`get_state` blob of an env with the same settings.
+        With ``restore_rng=False`` the current random stream is kept.
+        """
+        words = np.frombuffer(state, dtype=np.uint64, count=8)
+        if restore_rng:
+            self.np_random.bit_generator.state = {
+                "bit_generator": "PCG64",
+                "state": {
+                    "state": int(words[0]) | int(words[1]) << 64,
+                    "inc": int(words[2]) | int(words[3]) << 64,
+                },
+                "has_uint32": int(words[4]),
+                "uinteger": int(words[5]),
+            }
+
+        players = self._entities
+        pool = self._bullets
+        n = int(words[6])
+        self._elapsed_ticks = int(words[7])
+        offset = words.nbytes
+        for array in (players.state, players.time_to_next_action, players.direction):
+            array.flat = np.frombuffer(state, array.dtype, array.size, offset)
+            offset += array.nbytes
+        pool.state[:, :n] = np.frombuffer(state, np.float64, 3 * n, offset).reshape(
+            3, n
+        )
+        offset += 3 * n * 8
+        pool.owner[:n] = np.frombuffer(state, np.int64, n, offset)
+        pool.resize(n)
+
     @staticmethod
     def _transform_actions(action):
         return {
@@ -196,14 +355,20 @@ class TopDownShooterEnv(gym.Env):
         if player.cooldown > 0:
             return
         player.cooldown = 0.5
-        self._bullets.append(
-            Bullet(
-                x=player.x,
-                y=player.y,
-                angle=player.angle,
-                player=player,
-            )
+        bullet = self._bullets.spawn(player.x, player.y, player.angle, player.index)
+        if bullet is not None and self._profiler is not None:
+            self._profiler.count("bullets_spawned")
+
+    def _shoot_many(self, shooters: np.ndarray):
+        """:meth:`_shoot` for the players ``shooters``, in one batch."""
+        players = self._entities
+        shooters = shooters[players.cooldown[shooters] <= 0]
+        players.cooldown[shooters] = 0.5
+        spawned = self._bullets.spawn_many(
+            players.x[shooters], players.y[shooters], players.angle[shooters], shooters
         )
+        if self._profiler is not None:
+            self._profiler.count("bullets_spawned", spawned)
 
     def _move(self, action):
         if action["up"]:
@@ -227,154 +392,291 @@ class TopDownShooterEnv(gym.Env):
         self._agent.angle = np.mod(self._agent.angle, 2 * np.pi)
 
     def _any_players_alive(self):
-        return any(p.health > 0 for p in self._players)
+        return bool((self._entities.health[1:] > 0).any())
 
     def _update_players(self):
-        for player in self._players:
-            if player.health <= 0:
-                continue
-            player.time_to_next_action -= 0.5
-            if player.time_to_next_action <= 0:
-                player.direction = (
-                    np.random.randint(0, 3) - 1,
-                    np.random.randint(0, 3) - 1,
-                )
-                player.angle = np.random.rand() * 2 * np.pi
-                player.time_to_next_action = np.random.randint(0, 10)
+        if self.opponent_policy is not None:
+            self._update_players_from_policy()
+            return
+
+        players = self._entities
+        active = np.flatnonzero(players.health[1:] > 0) + 1
+        # One uniform draw per decision: direction x/y, angle, wait, shoot and,
+        # when aiming, the aim error.
+        draws = self.np_random.random((len(active), 6 if self.opponent_aim else 5))
+        if self.opponent_aim:
+            self._aim(active, draws[:, 5])
+        if self.backend == "numba":
+            self._update_players_compiled(draws)
+            return
 
-            player.x += player.direction[0]
-            player.y += player.direction[1]
-            player.x = np.clip(player.x, 0, self.window_size[0])
-            player.y = np.clip(player.y, 0, self.window_size[1])
+        players.time_to_next_action[active] -= 0.5
+        thinking = players.time_to_next_action[active] <= 0
+        think, draw = active[thinking], draws[thinking]
+        players.direction[think] = (draw[:, :2] * 3).astype(np.int64) - 1
+        if not self.opponent_aim:
+            players.angle[think] = draw[:, 2] * 2 * np.pi
+        players.time_to_next_action[think] = np.floor(draw[:, 3] * 10)
+
+        players.x[active] = np.clip(
+            players.x[active] + players.direction[active, 0], 0, self.window_size[0]
+        )
+        players.y[active] = np.clip(
+            players.y[active] + players.direction[active, 1], 0, self.window_size[1]
+        )
+
+        self._shoot_many(active[draws[:, 4] < self.opponent_fire_rate])
+
+    def _aim(self, active: np.ndarray, noise: np.ndarray):
+        """Turns the ``active`` opponents towards their nearest living enemy."""
+        players = self._entities
+        targets = players.health > 0
+        targets[0] = True
+        dx = players.x - players.x[active, None]
+        dy = players.y - players.y[active, None]
+        distance = np.where(targets, dx * dx + dy * dy, np.inf)
+        rows = np.arange(len(active))
+        distance[rows, active] = np.inf
+        nearest = np.argmin(distance, axis=1)
+
+        error = (1 - self.opponent_accuracy) * np.pi * (2 * noise - 1)
+        angle = np.arctan2(dy[rows, nearest], dx[rows, nearest]) + error
+        players.angle[active] = np.mod(angle, 2 * np.pi)
+
+    def _update_players_from_policy(self):
+        """Applies the actions of ``opponent_policy``, evaluated for all at once."""
+        players = self._entities
+        actions = np.asarray(self.opponent_policy(self.get_opponent_obs()))
+        actions = actions.reshape(self.num_players, -1)
+        alive = players.health[1:] > 0
+        active = np.flatnonzero(alive) + 1
+        up, down, left, right, shoot, rotate_left, rotate_right = actions[alive].T
+
+        players.x[active] = np.clip(
+            players.x[active] + right - left, 0, self.window_size[0]
+        )
+        players.y[active] = np.clip(
+            players.y[active] + down - up, 0, self.window_size[1]
+        )
+        self._shoot_many(active[shoot.astype(bool)])
+        players.angle[active] = np.mod(
+            players.angle[active] + (rotate_right - rotate_left) * np.pi / 8,
+            2 * np.pi,
+        )
 
-            if np.random.rand() < 0.1:
-                self._shoot(player)
+    def _update_players_compiled(self, draws: np.ndarray):
+        players = self._entities
+        pool = self._bullets
+        count = len(pool)
+        pool.resize(
+            kernels.update_players(
+                players.x,
+                players.y,
+                players.angle,
+                players.health,
+                players.cooldown,
+                players.direction,
+                players.time_to_next_action,
+                draws,
+                self.opponent_aim,
+                self.opponent_fire_rate,
+                self.window_size[0],
+                self.window_size[1],
+                pool.x,
+                pool.y,
+                pool.angle,
+                pool.owner,
+                count,
+            )
+        )
+        if self._profiler is not None:
+            self._profiler.count("bullets_spawned", len(pool) - count)
 
     def _update_bullets(self):
-        for bullet in self._bullets:
-            bullet.x += np.cos(bullet.angle) * bullet.speed
-            bullet.y += np.sin(bullet.angle) * bullet.speed
-            if bullet.x < 0 or bullet.x > self.window_size[0]:
-                self._bullets.remove(bullet)
-            if bullet.y < 0 or bullet.y > self.window_size[1]:
-                try:
-                    self._bullets.remove(bullet)
-                except ValueError:
-                    pass
-
-            for player in self._players:
-                if player.health <= 0:
-                    continue
-                if bullet.collides_with(player):
-                    if bullet.player is not player:
-                        player.health -= bullet.damage
-                        player.score -= bullet.damage
-                        bullet.player.score += bullet.damage
-                        try:
-                            self._bullets.remove(bullet)
-                        except ValueError:
-                            pass
-                        break
-
-            if bullet.collides_with(self._agent):
-                if self._agent is not bullet.player:
-                    try:
-                        self._bullets.remove(bullet)
-                    except ValueError:
-                        pass
-                    self._agent.health -= bullet.damage
-                    self._agent.score -= bullet.damage
-                    bullet.player.score += bullet.damage
+        pool = self._bullets
+        n = len(pool)
+        if n == 0:
+            return
+        if self.backend == "numba":
+            self._update_bullets_compiled()
+            return
+        x, y, owner = pool.x[:n], pool.y[:n], pool.owner[:n]
+        x += np.cos(pool.angle[:n]) * pool.speed
+        y += np.sin(pool.angle[:n]) * pool.speed
+        gone = (x < 0) | (x > self.window_size[0]) | (y < 0) | (y > self.window_size[1])
+
+        players = self._entities
+        targets = players.health > 0
+        targets[0] = True
+        self._grid.build(players.x, players.y, targets)
+        inside = np.flatnonzero(~gone)
+        query_index, target = self._grid.query(x[inside], y[inside], pool.radius)
+        if self._profiler is not None:
+            self._profiler.count("collision_tests", self._grid.tests)
+        bullet = inside[query_index]
+        own = owner[bullet] == target
+        bullet, target = bullet[~own], target[~own]
+
+        # Each bullet hits its first target: opponents in order, the agent last.
+        priority = np.where(target == 0, len(players), target)
+        order = np.lexsort((priority, bullet))
+        bullet, target = bullet[order], target[order]
+        first = np.ones(len(bullet), dtype=bool)
+        first[1:] = bullet[1:] != bullet[:-1]
+        bullet, target = bullet[first], target[first]
+
+        np.subtract.at(players.health, target, pool.damage)
+        np.subtract.at(players.score, target, pool.damage)
+        np.add.at(players.score, owner[bullet], pool.damage)
+        gone[bullet] = True
+        pool.remove(gone)
+
+    def _update_bullets_compiled(self):
+        pool = self._bullets
+        players = self._entities
+        count, tests = kernels.update_bullets(
+            pool.x,
+            pool.y,
+            pool.angle,
+            pool.owner,
+            len(pool),
+            pool.speed,
+            pool.radius,
+            pool.damage,
+            self.window_size[0],
+            self.window_size[1],
+            players.x,
+            players.y,
+            players.health,
+            players.score,
+        )
+        pool.resize(count)
+        if self._profiler is not None:
+            self._profiler.count("collision_tests", tests)
 
     def step(
         self, action: ActType
     ) -> tuple[ObsType, SupportsFloat, bool, bool, dict[str, Any]]:
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.begin()
+
+        tick_action = action
         action: dict = self._transform_actions(action)
 
-        self._agent.cooldown -= 0.01
-        self._agent.score = 0
-        for player in self._players:
-            player.cooldown -= 0.01
-            player.score = 0
+        # The action is repeated for ``frame_skip`` ticks, until the last
+        # opponent dies or until ``max_episode_ticks`` is used up, and only the
+        # final tick is observed.
+        reward = 0
+        truncated = False
+        for _ in range(self.frame_skip):
+            terminated = self._tick(action)
+            self._elapsed_ticks += 1
+            reward += self._agent.score
+            if self.tick_callback is not None:
+                self.tick_callback(
+                    tick_action, self._agent.score + 1000 * terminated, terminated
+                )
+            if terminated:
+                reward += 1000
+                break
+            if (
+                self.max_episode_ticks is not None
+                and self._elapsed_ticks >= self.max_episode_ticks
+            ):
+                truncated = True
+                break
+
+        obs = self._get_obs()
+        info = self._get_info()
+        if profiler is not None:
+            profiler.lap("get_obs")
+
+        if self.render_mode == "human":
+            self._render_frame()
+            if profiler is not None:
+                profiler.lap("render")
+
+        if profiler is not None:
+            profiler.count("bullets_alive", len(self._bullets))
+            info["profile"] = profiler.end()
+
+        return obs, reward, terminated, truncated, info
+
+    def _tick(self, action: dict) -> bool:
+        """Advances the world by one tick. Returns whether the episode ended."""
+        profiler = self._profiler
+        self._entities.cooldown -= 0.01
+        self._entities.score[:] = 0
 
         self._move(action)
+        if profiler is not None:
+            profiler.lap("move")
 
         if action["shoot"]:
             self._shoot(self._agent)
+        if profiler is not None:
+            profiler.lap("shoot")
 
         self._rotate(action)
+        if profiler is not None:
+            profiler.lap("rotate")
 
         self._update_bullets()
+        if profiler is not None:
+            profiler.lap("update_bullets")
 
         self._update_players()
+        if profiler is not None:
+            profiler.lap("update_players")
 
-        terminated = not self._any_players_alive()
-        reward = 1000 if terminated else 0
-
-        reward += self._agent.score
+        return not self._any_players_alive()
 
-        obs = self._get_obs()
-        info = self._get_info()
-
-        if self.render_mode == "human":
-            self._render_frame()
-
-        return obs, reward, terminated, False, info
+    def get_profile(self) -> dict | None:
+        """Aggregated step profile, or ``None`` when profiling is disabled."""
+        if self._profiler is None:
+            return None
+        return self._profiler.summary()
 
     def render(self):
         if self.render_mode == "rgb_array":
             return self._render_frame()
 
     def _render_frame(self):
-        if self.window is None and self.render_mode == "human":
+        players = self._entities
+        pool = self._bullets
+        n = len(pool)
+        frame = self._rasterizer.draw_world(
+            players.x, players.y, players.health, pool.x[:n], pool.y[:n], pool.radius
+        )
+
+        if self.render_mode == "human":
+            self._show(frame)
+        else:
+            return frame.copy()
+
+    def _show(self, frame: np.ndarray):
+        import pygame
+
+        if self.window is None:
             pygame.init()
             pygame.display.init()
-            self.window = pygame.display.set_mode(self.window_size)
+            self.window = pygame.display.set_mode(frame.shape[1::-1])
             pygame.display.set_caption("TopDownShooter")
-        if self.clock is None and self.render_mode == "human":
+        if self.clock is None:
             self.clock = pygame.time.Clock()
 
-        canvas = pygame.Surface(self.window_size)
-        canvas.fill((255, 255, 255))
-
-        pygame.draw.circle(
-            canvas,
-            (0, 0, 100),
-            (self._agent.x, self._agent.y),
-            5,
-            0,
-        )
-
-        for player in self._players:
-            if player.health <= 0:
-                continue
-            pygame.draw.circle(
-                canvas,
-                (100, 0, 0),
-                (player.x, player.y),
-                5,
-                0,
-            )
-
-        for bullet in self._bullets:
-            pygame.draw.circle(
-                canvas,
-                (0, 0, 0),
-                (bullet.x, bullet.y),
-                bullet.radius,
-                0,
-            )
-
-        if self.render_mode == "human":
-            self.window.blit(canvas, canvas.get_rect())
-            pygame.event.pump()
-            pygame.display.update()
-            self.clock.tick(self.metadata["render_fps"])
-        else:
-            return np.transpose(np.array(pygame.surfarray.pixels3d(canvas)), (1, 0, 2))
+        if frame.ndim == 2:
+            frame = np.repeat(frame[..., None], 3, axis=2)
+        pygame.surfarray.blit_array(self.window, frame.swapaxes(0, 1))
+        pygame.event.pump()
+        pygame.display.update()
+        self.clock.tick(self.metadata["render_fps"])
 
     def close(self):
         if self.window is not None:
+            import pygame
+
             pygame.display.quit()
             pygame.quit()
 
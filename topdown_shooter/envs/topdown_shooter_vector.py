@@ -0,0 +1,267 @@
+from typing import Any
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import VectorEnv
+
+from topdown_shooter.envs.topdown_shooter import make_observation_space
+
+
+class TopDownShooterVectorEnv(VectorEnv):
+    """
+    Runs ``num_envs`` TopDownShooter matches in a single process.
+
+    Every entity attribute lives in an ``(num_envs, k)`` array, column 0 of the
+    player arrays being the agent and the other columns the opponents, so one
+    call to :meth:`step` advances all matches with vectorized operations. Observations
+    use the same flattened layout as :class:`TopDownShooterEnv`.
+    """
+
+    metadata = {"render_modes": [], "autoreset": True}
+
+    def __init__(
+        self,
+        num_envs: int,
+        max_episode_steps: int | None = None,
+        num_players: int = 7,
+        max_observed_bullets: int = 10,
+        arena_size: tuple[int, int] = (640, 480),
+        bullet_speed: float = 4,
+        bullet_damage: float = 10,
+        max_bullets: int | None = None,
+    ):
+        if max_bullets is None:
+            max_bullets = max(64, 8 * (num_players + 1))
+        assert max_observed_bullets < max_bullets
+        self.window_size = tuple(arena_size)
+        self.num_players = num_players
+        self.max_observed_bullets = max_observed_bullets
+        self.max_bullets = max_bullets
+        self.max_episode_steps = max_episode_steps
+
+        self._observation_space = make_observation_space(
+            self.window_size, self.num_players, self.max_observed_bullets
+        )
+        super().__init__(
+            num_envs,
+            spaces.flatten_space(self._observation_space),
+            spaces.MultiDiscrete([2, 2, 2, 2, 2, 2, 2]),
+        )
+
+        shape = (num_envs, self.num_players + 1)
+        self._x = np.zeros(shape)
+        self._y = np.zeros(shape)
+        self._angle = np.zeros(shape)
+        self._health = np.zeros(shape)
+        self._cooldown = np.zeros(shape)
+        self._score = np.zeros(shape)
+        self._direction = np.zeros(shape + (2,), dtype=np.int64)
+        self._time_to_next_action = np.zeros(shape)
+
+        shape = (num_envs, max_bullets)
+        self._bullet_x = np.zeros(shape)
+        self._bullet_y = np.zeros(shape)
+        self._bullet_angle = np.zeros(shape)
+        self._bullet_owner = np.zeros(shape, dtype=np.int64)
+        self._bullet_alive = np.zeros(shape, dtype=bool)
+        self.bullet_radius = 5
+        self.bullet_speed = bullet_speed
+        self.bullet_damage = bullet_damage
+
+        self._elapsed_steps = np.zeros(num_envs, dtype=np.int64)
+        # Opponents are tested before the agent, as in TopDownShooterEnv.
+        self._hit_order = np.r_[1 : self.num_players + 1, 0]
+
+    def _reset_envs(self, mask: np.ndarray):
+        n = int(mask.sum())
+        shape = (n, self.num_players + 1)
+        self._x[mask] = self.np_random.integers(0, self.window_size[0], shape)
+        self._y[mask] = self.np_random.integers(0, self.window_size[1], shape)
+        self._angle[mask] = 0
+        self._health[mask] = 100
+        self._cooldown[mask] = 0
+        self._score[mask] = 0
+        self._direction[mask] = 0
+        self._time_to_next_action[mask] = 0
+        self._bullet_alive[mask] = False
+        self._elapsed_steps[mask] = 0
+
+    def reset(
+        self,
+        seed: int | list[int] | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> tuple[np.ndarray, dict[str, Any]]:
+        if isinstance(seed, list):
+            seed = seed[0]
+        if seed is not None:
+            self._np_random, seed = seeding.np_random(seed)
+
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+
+        return self._get_obs(), {}
+
+    def _shoot(self, mask: np.ndarray):
+        """Spawns a bullet for every (env, player) pair set in ``mask``."""
+        mask = mask & (self._cooldown <= 0)
+        env_idx, player_idx = np.nonzero(mask)
+        if len(env_idx) == 0:
+            return
+        self._cooldown[env_idx, player_idx] = 0.5
+
+        # Shots and free slots are both enumerated in (env, rank) order, so after
+        # dropping the shots that don't fit the two index lists line up.
+        free = ~self._bullet_alive
+        free_count = free.sum(axis=1)
+        shot_rank = np.cumsum(mask, axis=1)[env_idx, player_idx] - 1
+        fits = shot_rank < free_count[env_idx]
+        env_idx, player_idx = env_idx[fits], player_idx[fits]
+        slot_rank = np.cumsum(free, axis=1) - 1
+        _, slot_idx = np.nonzero(free & (slot_rank < mask.sum(axis=1)[:, None]))
+
+        self._bullet_x[env_idx, slot_idx] = self._x[env_idx, player_idx]
+        self._bullet_y[env_idx, slot_idx] = self._y[env_idx, player_idx]
+        self._bullet_angle[env_idx, slot_idx] = self._angle[env_idx, player_idx]
+        self._bullet_owner[env_idx, slot_idx] = player_idx
+        self._bullet_alive[env_idx, slot_idx] = True
+
+    def _move(self, actions: np.ndarray):
+        self._x[:, 0] += actions[:, 3].astype(np.int64) - actions[:, 2]
+        self._y[:, 0] += actions[:, 1].astype(np.int64) - actions[:, 0]
+        np.clip(self._x[:, 0], 0, self.window_size[0], out=self._x[:, 0])
+        np.clip(self._y[:, 0], 0, self.window_size[1], out=self._y[:, 0])
+
+    def _rotate(self, actions: np.ndarray):
+        turn = actions[:, 6].astype(np.int64) - actions[:, 5]
+        self._angle[:, 0] = np.mod(self._angle[:, 0] + turn * np.pi / 8, 2 * np.pi)
+
+    def _update_bullets(self):
+        alive = self._bullet_alive
+        self._bullet_x += np.cos(self._bullet_angle) * self.bullet_speed
+        self._bullet_y += np.sin(self._bullet_angle) * self.bullet_speed
+        alive &= (self._bullet_x >= 0) & (self._bullet_x <= self.window_size[0])
+        alive &= (self._bullet_y >= 0) & (self._bullet_y <= self.window_size[1])
+
+        # (env, bullet, player) hit matrix, columns ordered by hit priority.
+        order = self._hit_order
+        dx = self._bullet_x[:, :, None] - self._x[:, None, order]
+        dy = self._bullet_y[:, :, None] - self._y[:, None, order]
+        hits = dx * dx + dy * dy < self.bullet_radius**2
+        hits &= alive[:, :, None]
+        hits &= self._bullet_owner[:, :, None] != order
+        hits[:, :, :-1] &= self._health[:, None, order[:-1]] > 0
+
+        env_idx, bullet_idx = np.nonzero(hits.any(axis=2))
+        if len(env_idx) == 0:
+            return
+        target = order[hits[env_idx, bullet_idx].argmax(axis=1)]
+        owner = self._bullet_owner[env_idx, bullet_idx]
+        alive[env_idx, bullet_idx] = False
+        np.subtract.at(self._health, (env_idx, target), self.bullet_damage)
+        np.subtract.at(self._score, (env_idx, target), self.bullet_damage)
+        np.add.at(self._score, (env_idx, owner), self.bullet_damage)
+
+    def _update_players(self):
+        opponents = (slice(None), slice(1, None))
+        active = self._health[opponents] > 0
+        shape = active.shape
+        self._time_to_next_action[opponents] -= np.where(active, 0.5, 0)
+
+        # One uniform draw per decision: direction x/y, angle, wait, shoot.
+        draws = self.np_random.random(shape + (5,))
+        think = active & (self._time_to_next_action[opponents] <= 0)
+        direction = (draws[..., :2] * 3).astype(np.int64) - 1
+        angle = draws[..., 2] * 2 * np.pi
+        wait = np.floor(draws[..., 3] * 10)
+        self._direction[opponents] = np.where(
+            think[..., None], direction, self._direction[opponents]
+        )
+        self._angle[opponents] = np.where(think, angle, self._angle[opponents])
+        self._time_to_next_action[opponents] = np.where(
+            think, wait, self._time_to_next_action[opponents]
+        )
+
+        step = np.where(active[..., None], self._direction[opponents], 0)
+        self._x[opponents] = np.clip(
+            self._x[opponents] + step[..., 0], 0, self.window_size[0]
+        )
+        self._y[opponents] = np.clip(
+            self._y[opponents] + step[..., 1], 0, self.window_size[1]
+        )
+
+        shoot = np.zeros(self._x.shape, dtype=bool)
+        shoot[opponents] = active & (draws[..., 4] < 0.1)
+        self._shoot(shoot)
+
+    def _get_obs(self) -> np.ndarray:
+        n, k = self.num_envs, self.max_observed_bullets
+        obs = np.empty((n, 1 + 3 * k + 4 * (self.num_players + 1)), np.float32)
+        obs[:, 0] = self._cooldown[:, 0]
+
+        # Nearest bullets first; dead slots sort last and are zeroed.
+        dx = self._bullet_x - self._x[:, :1]
+        dy = self._bullet_y - self._y[:, :1]
+        distance = np.where(self._bullet_alive, dx * dx + dy * dy, np.inf)
+        near = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distance, near, axis=1), axis=1)
+        near = np.take_along_axis(near, order, axis=1)
+        valid = np.take_along_axis(self._bullet_alive, near, axis=1)
+        bullets = obs[:, 1 : 1 + 3 * k].reshape(n, k, 3)
+        bullets[..., 0] = np.take_along_axis(self._bullet_angle, near, axis=1)
+        bullets[..., 1] = np.take_along_axis(self._bullet_x, near, axis=1)
+        bullets[..., 2] = np.take_along_axis(self._bullet_y, near, axis=1)
+        bullets[~valid] = 0
+
+        # Opponents first, then the agent ("you"), each as (angle, health, x, y).
+        players = obs[:, 1 + 3 * k :].reshape(n, self.num_players + 1, 4)
+        order = self._hit_order
+        players[..., 0] = self._angle[:, order]
+        players[..., 1] = self._health[:, order]
+        players[..., 2] = self._x[:, order]
+        players[..., 3] = self._y[:, order]
+        return obs
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        actions = np.asarray(actions).reshape(self.num_envs, -1)
+
+        self._cooldown -= 0.01
+        self._score[:] = 0
+
+        self._move(actions)
+
+        shoot = np.zeros(self._x.shape, dtype=bool)
+        shoot[:, 0] = actions[:, 4] != 0
+        self._shoot(shoot)
+
+        self._rotate(actions)
+
+        self._update_bullets()
+
+        self._update_players()
+
+        self._elapsed_steps += 1
+        terminated = ~(self._health[:, 1:] > 0).any(axis=1)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_episode_steps is not None:
+            truncated = ~terminated & (self._elapsed_steps >= self.max_episode_steps)
+        reward = np.where(terminated, 1000.0, 0.0) + self._score[:, 0]
+
+        obs = self._get_obs()
+        infos = {}
+        done = terminated | truncated
+        if done.any():
+            final_obs = np.full(self.num_envs, None, dtype=object)
+            final_info = np.full(self.num_envs, None, dtype=object)
+            for i in np.flatnonzero(done):
+                final_obs[i] = obs[i].copy()
+                final_info[i] = {}
+            infos["final_observation"] = final_obs
+            infos["_final_observation"] = done
+            infos["final_info"] = final_info
+            infos["_final_info"] = done
+            self._reset_envs(done)
+            obs[done] = self._get_obs()[done]
+
+        return obs, reward, terminated, truncated, infos